@@ -42,6 +42,13 @@ class Settings:
     API_TITLE: str = "LLM-Protect Input Preparation API"
     API_VERSION: str = "1.0.0"
     API_PREFIX: str = "/api/v1"
+    # Server processes when run as a script. Sessions and the loaded LLM are
+    # per process, so more than one only suits session-less deployments.
+    API_WORKERS: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    
+    # Threads for CPU-bound request work (file extraction, Layer 0 and image
+    # analysis); same default as ThreadPoolExecutor
+    WORKER_THREADS: int = int(os.getenv("WORKER_THREADS", str(min(32, (os.cpu_count() or 1) + 4))))
     
     # Token estimation (rough approximation: 1 token ≈ 4 characters)
     CHARS_PER_TOKEN: int = 4
@@ -4,13 +4,19 @@ Main FastAPI application for the Input Preparation Module.
 Provides endpoints for text and media preparation with HMAC verification.
 """
 
+import asyncio
+import hashlib
+import json
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 from typing import Optional, List
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, status, Request
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
@@ -20,7 +26,7 @@ from app.models.schemas import (
     Layer0Output, ImageProcessingOutput, EmojiSummary
 )
 from app.utils.logger import setup_logging, get_logger, RequestLogger
-from app.services.input_parser import parse_and_validate, validate_request
+from app.services.input_parser import parse_and_validate, validate_request, generate_request_id
 from app.services.file_extractor import (
     extract_file_text,
     validate_file,
@@ -28,13 +34,13 @@ from app.services.file_extractor import (
     extract_images_from_pdf
 )
 from app.services.rag_handler import process_rag_data
-from app.services.text_normalizer import normalize_text
+from app.services.text_normalizer import normalize_text, extract_emojis, get_emoji_descriptions
 from app.services.media_processor import (
     process_media,
     check_image_library_availability,
     save_media_for_further_processing
 )
-from app.services.token_processor import calculate_tokens_and_stats
+from app.services.token_processor import calculate_tokens_and_stats, estimate_tokens
 from app.services.payload_packager import (
     package_payload,
     validate_payload,
@@ -45,11 +51,25 @@ from app.services.llm_service import generate_response, check_model_availability
 from app.services.output_saver import get_output_saver
 from app.services.session_manager import get_session_manager, format_conversation_for_rag
 from app.services.integration_layer import prepare_layer0_output, prepare_image_processing_output
+from app.services.advanced_image_processor import check_libraries_available
 
 # Setup logging
 setup_logging()
 logger = get_logger(__name__)
 
+# Optional orjson: serializes the large nested PreparedInput responses in
+# native code instead of json.dumps, and parses the external_data form
+# field (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+    DEFAULT_RESPONSE_CLASS = ORJSONResponse
+    json_loads = orjson.loads
+except ImportError:
+    DEFAULT_RESPONSE_CLASS = JSONResponse
+    json_loads = json.loads
+    logger.info("orjson not available. Requests and responses use json.")
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.API_TITLE,
@@ -60,9 +80,22 @@ app = FastAPI(
         "and HMAC verification for secure LLM input preparation."
     ),
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=DEFAULT_RESPONSE_CLASS
 )
 
+# Library availability is fixed at import time, so /health reports a
+# snapshot built once instead of re-collecting it on every probe
+LIBRARY_AVAILABILITY = {
+    **check_library_availability(),
+    "image": check_image_library_availability(),
+    **check_libraries_available()
+}
+if LIBRARY_AVAILABILITY["txt"] and LIBRARY_AVAILABILITY["md"]:
+    HEALTH_STATUS, HEALTH_MESSAGE = "healthy", "All systems operational"
+else:
+    HEALTH_STATUS, HEALTH_MESSAGE = "degraded", "Some critical libraries are missing"
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -72,9 +105,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON responses (PreparedInput with external chunks, image
+# analysis); small ones aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Mount static files (for web interface)
 try:
-    from pathlib import Path
     static_path = Path(__file__).parent / "static"
     static_path.mkdir(exist_ok=True)
     app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
@@ -104,6 +140,59 @@ class GenerateResponse(BaseModel):
     preparation_metadata: Optional[dict] = None
 
 
+# Uploads are copied to disk in chunks of this size, never held whole in memory
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _copy_upload(src, path: str, max_bytes: int) -> int:
+    """Copy an upload's file object to path, stopping once max_bytes is exceeded."""
+    size = 0
+    with open(path, "wb") as dst:
+        while chunk := src.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                break
+            dst.write(chunk)
+    return size
+
+
+async def save_upload(upload: UploadFile, path: str) -> int:
+    """
+    Save an uploaded file to disk without blocking the event loop.
+    
+    The file is streamed in UPLOAD_CHUNK_SIZE chunks in a worker thread, so
+    memory per upload stays constant, and copying stops as soon as the
+    upload exceeds MAX_FILE_SIZE_MB.
+    
+    Args:
+        upload: Uploaded file
+        path: Destination path
+    
+    Returns:
+        Number of bytes written
+    
+    Raises:
+        HTTPException: If the file is larger than MAX_FILE_SIZE_MB
+    """
+    size = await asyncio.to_thread(_copy_upload, upload.file, path, settings.MAX_FILE_SIZE_BYTES)
+    if not settings.validate_file_size(size):
+        await asyncio.to_thread(os.remove, path)
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB"
+        )
+    return size
+
+
+def _remove_files(paths: List[str]) -> None:
+    """Delete files that may or may not have been written."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize application on startup."""
@@ -113,10 +202,25 @@ async def startup_event():
     logger.info(f"Max file size: {settings.MAX_FILE_SIZE_MB}MB")
     logger.info(f"Allowed extensions: {settings.ALLOWED_EXTENSIONS}")
     
+    # Bound the threads that asyncio.to_thread hands CPU-bound work to, so a
+    # burst of uploads can't oversubscribe the cores
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.WORKER_THREADS, thread_name_prefix="prep-worker")
+    )
+    logger.info(f"Worker threads: {settings.WORKER_THREADS}")
+    
     # Check library availability
     file_libs = check_library_availability()
     logger.info(f"File extraction libraries: {file_libs}")
     logger.info(f"Image processing: {'enabled' if check_image_library_availability() else 'disabled'}")
+    
+    # Create shared services now, so the first request does not pay for
+    # constructing them (output directories are created on init)
+    get_session_manager()
+    try:
+        get_output_saver()
+    except OSError as e:
+        logger.warning(f"Output directories not initialized: {e}")
     logger.info("=" * 60)
 
 
@@ -127,35 +231,12 @@ async def health_check():
     
     Returns service status and library availability.
     """
-    file_libs = check_library_availability()
-    image_available = check_image_library_availability()
-    
-    # Check advanced image processing libraries
-    from app.services.advanced_image_processor import check_libraries_available
-    advanced_libs = check_libraries_available()
-    
-    all_libs = {
-        **file_libs,
-        "image": image_available,
-        **advanced_libs
-    }
-    
-    # Determine status
-    critical_missing = not all([file_libs["txt"], file_libs["md"]])
-    
-    if critical_missing:
-        status_msg = "degraded"
-        message = "Some critical libraries are missing"
-    else:
-        status_msg = "healthy"
-        message = "All systems operational"
-    
     return HealthResponse(
-        status=status_msg,
+        status=HEALTH_STATUS,
         version=settings.API_VERSION,
         timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        libraries=all_libs,
-        message=message
+        libraries=LIBRARY_AVAILABILITY,
+        message=HEALTH_MESSAGE
     )
 
 
@@ -190,15 +271,14 @@ async def prepare_text_input(
     5. Calculate tokens and stats
     6. Package final payload with HMAC signatures
     """
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     step_times = {}
     
     # Parse external_data if it's a JSON string
-    import json
     external_data_list = None
     if external_data:
         try:
-            external_data_list = json.loads(external_data)
+            external_data_list = json_loads(external_data)
         except json.JSONDecodeError:
             # Treat as single string
             external_data_list = [external_data]
@@ -231,7 +311,7 @@ async def prepare_text_input(
     
     try:
         # Step 1: Parse and validate
-        step_start = time.time()
+        step_start = time.perf_counter_ns()
         
         # Validate request
         valid, error = validate_request(user_prompt)
@@ -256,19 +336,10 @@ async def prepare_text_input(
             
             temp_file_path = str(settings.get_file_path(filename))
             
-            with open(temp_file_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
+            # Rejects files over MAX_FILE_SIZE_MB
+            size_bytes = await save_upload(file, temp_file_path)
             
-            # Validate file size
-            if not settings.validate_file_size(len(content)):
-                os.remove(temp_file_path)  # Cleanup
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB"
-                )
-            
-            logger.info(f"File uploaded: {filename} ({len(content)} bytes)")
+            logger.info(f"File uploaded: {filename} ({size_bytes} bytes)")
             
             # Determine if it's an image or text file
             if settings.is_image_file(filename):
@@ -287,7 +358,7 @@ async def prepare_text_input(
         )
         
         request_id = parsed["request_id"]
-        step_times["parse_validate"] = (time.time() - step_start) * 1000
+        step_times["parse_validate"] = (time.perf_counter_ns() - step_start) / 1_000_000
         
         # DETAILED LOG: Show parsed input
         logger.info(f"[{request_id}] ===== STEP 1: PARSED INPUT =====")
@@ -302,7 +373,7 @@ async def prepare_text_input(
         
         with RequestLogger(request_id, logger) as req_logger:
             # Step 2: Extract file text (if file provided)
-            step_start = time.time()
+            step_start = time.perf_counter_ns()
             file_chunks = []
             file_info = None
             
@@ -310,8 +381,11 @@ async def prepare_text_input(
                 valid_file, error = validate_file(parsed["raw_file"])
                 if valid_file:
                     try:
-                        file_chunks, file_info = extract_file_text(parsed["raw_file"])
-                        req_logger.log_step("file_extraction", (time.time() - step_start) * 1000)
+                        # PDF/DOCX parsing is CPU-bound; keep it off the event loop
+                        file_chunks, file_info = await asyncio.to_thread(
+                            extract_file_text, parsed["raw_file"]
+                        )
+                        req_logger.log_step("file_extraction", (time.perf_counter_ns() - step_start) / 1_000_000)
                         
                         # DETAILED LOG: Show file extraction results
                         logger.info(f"[{request_id}] ===== STEP 2: FILE EXTRACTION =====")
@@ -331,10 +405,10 @@ async def prepare_text_input(
                 logger.info(f"[{request_id}] ===== STEP 2: FILE EXTRACTION =====")
                 logger.info(f"[{request_id}] No file provided")
             
-            step_times["file_extraction"] = (time.time() - step_start) * 1000
+            step_times["file_extraction"] = (time.perf_counter_ns() - step_start) / 1_000_000
             
             # Step 3: Process RAG data and conversation context (SEPARATE per INNOVATION 4)
-            step_start = time.time()
+            step_start = time.perf_counter_ns()
             external_chunks, hmacs, rag_enabled = process_rag_data(
                 user_prompt=parsed["raw_user"],
                 external_data=parsed["raw_external"],
@@ -342,7 +416,7 @@ async def prepare_text_input(
                 retrieve_from_db=retrieve_from_vector_db,
                 conversation_text=conversation_text  # Separate from RAG!
             )
-            step_times["rag_processing"] = (time.time() - step_start) * 1000
+            step_times["rag_processing"] = (time.perf_counter_ns() - step_start) / 1_000_000
             req_logger.log_step("rag_processing", step_times["rag_processing"])
             
             # DETAILED LOG: Show RAG processing
@@ -357,7 +431,7 @@ async def prepare_text_input(
             logger.info(f"[{request_id}] Delimiter format: [EXTERNAL]content[/EXTERNAL]")
             
             # Step 4: Normalize text
-            step_start = time.time()
+            step_start = time.perf_counter_ns()
             normalized_user, user_emojis, user_emoji_descs = normalize_text(
                 parsed["raw_user"],
                 preserve_emojis=True
@@ -367,7 +441,7 @@ async def prepare_text_input(
             # The chunks are already delimited, so we just use them as-is
             normalized_external = external_chunks
             
-            step_times["normalization"] = (time.time() - step_start) * 1000
+            step_times["normalization"] = (time.perf_counter_ns() - step_start) / 1_000_000
             req_logger.log_step("normalization", step_times["normalization"])
             
             # DETAILED LOG: Show normalization
@@ -382,7 +456,7 @@ async def prepare_text_input(
             logger.info(f"[{request_id}] Emojis preserved in text: YES")
             
             # Step 5: Process media (images and/or emojis)
-            step_start = time.time()
+            step_start = time.perf_counter_ns()
             
             # Process image if uploaded (new feature!)
             image_to_process = parsed.get("raw_image") if parsed.get("validation", {}).get("image_valid") else None
@@ -396,7 +470,7 @@ async def prepare_text_input(
             if image_to_process:
                 logger.info(f"[{request_id}] Image processed from upload: {image_to_process}")
             
-            step_times["media_processing"] = (time.time() - step_start) * 1000
+            step_times["media_processing"] = (time.perf_counter_ns() - step_start) / 1_000_000
             
             # Save media for further layer processing if present
             if (image_dict and "error" not in image_dict) or user_emojis:
@@ -410,7 +484,7 @@ async def prepare_text_input(
                     logger.info(f"[{request_id}] ✓ Media saved for further processing at: {media_paths['temp_dir']}")
             
             # Step 6: Calculate tokens and stats
-            step_start = time.time()
+            step_start = time.perf_counter_ns()
             
             # Calculate total extracted chars from file
             extracted_total_chars = sum(len(chunk.content) for chunk in file_chunks)
@@ -421,7 +495,7 @@ async def prepare_text_input(
                 file_chunks_count=len(file_chunks),
                 extracted_total_chars=extracted_total_chars
             )
-            step_times["token_calculation"] = (time.time() - step_start) * 1000
+            step_times["token_calculation"] = (time.perf_counter_ns() - step_start) / 1_000_000
             req_logger.log_step("token_calculation", step_times["token_calculation"])
             
             # DETAILED LOG: Show token stats
@@ -433,12 +507,15 @@ async def prepare_text_input(
             logger.info(f"[{request_id}] Extracted file chars: {stats.extracted_total_chars}")
             
             # Step 6.5: Layer 0 Analysis (Unicode + Heuristics + Embeddings)
-            step_start = time.time()
+            step_start = time.perf_counter_ns()
             attachment_texts = []
             if image_dict and "description" in image_dict and image_dict["description"]:
                 attachment_texts.append(image_dict["description"])
             
-            layer0_output = prepare_layer0_output(
+            # Unicode analysis, heuristics and embeddings scale with the
+            # external data size; run them in a worker thread
+            layer0_output = await asyncio.to_thread(
+                prepare_layer0_output,
                 request_id=request_id,
                 timestamp=datetime.utcnow().isoformat() + 'Z',
                 user_text=normalized_user,
@@ -449,10 +526,10 @@ async def prepare_text_input(
                 token_count=stats.token_estimate,
                 char_total=stats.char_total,
                 attachment_texts=attachment_texts,
-                prep_time_ms=(time.time() - start_time) * 1000,
+                prep_time_ms=(time.perf_counter_ns() - start_time) / 1_000_000,
                 store_raw_snapshot=True
             )
-            step_times["layer0_analysis"] = (time.time() - step_start) * 1000
+            step_times["layer0_analysis"] = (time.perf_counter_ns() - step_start) / 1_000_000
             
             logger.info(f"[{request_id}] ===== LAYER 0 ANALYSIS =====")
             logger.info(f"[{request_id}] Unicode obfuscation: {layer0_output.unicode_analysis.unicode_obfuscation_flag}")
@@ -465,12 +542,15 @@ async def prepare_text_input(
             # Step 6.6: Advanced Image Processing (if image uploaded)
             image_processing_output = None
             if image_to_process:
-                step_start = time.time()
+                step_start = time.perf_counter_ns()
                 
                 logger.info(f"[{request_id}] ===== ADVANCED IMAGE PROCESSING =====")
                 logger.info(f"[{request_id}] Processing image: {image_to_process}")
                 
-                image_processing_output = prepare_image_processing_output(
+                # Decode/LSB/entropy work runs in NumPy and Pillow, which
+                # release the GIL; keep it off the event loop thread
+                image_processing_output = await asyncio.to_thread(
+                    prepare_image_processing_output,
                     request_id=request_id,
                     timestamp=datetime.utcnow().isoformat() + 'Z',
                     image_paths=[image_to_process],
@@ -480,7 +560,7 @@ async def prepare_text_input(
                     ocr_confidence=50.0
                 )
                 
-                step_times["image_processing"] = (time.time() - step_start) * 1000
+                step_times["image_processing"] = (time.perf_counter_ns() - step_start) / 1_000_000
                 
                 logger.info(f"[{request_id}] Images analyzed: {image_processing_output.total_images}")
                 logger.info(f"[{request_id}] Suspicious images: {image_processing_output.suspicious_images_count}")
@@ -492,8 +572,8 @@ async def prepare_text_input(
                 logger.info(f"[{request_id}] No image provided, skipping advanced analysis")
             
             # Step 7: Package payload
-            step_start = time.time()
-            total_time = (time.time() - start_time) * 1000
+            step_start = time.perf_counter_ns()
+            total_time = (time.perf_counter_ns() - start_time) / 1_000_000
             
             prepared = package_payload(
                 original_user_prompt=parsed["raw_user"],  # Original for LLM
@@ -515,7 +595,7 @@ async def prepare_text_input(
                 layer0_output=layer0_output,
                 image_processing_output=image_processing_output
             )
-            step_times["packaging"] = (time.time() - step_start) * 1000
+            step_times["packaging"] = (time.perf_counter_ns() - step_start) / 1_000_000
             
             # DETAILED LOG: Show final payload
             logger.info(f"[{request_id}] ===== STEP 6: PAYLOAD PACKAGING =====")
@@ -541,15 +621,17 @@ async def prepare_text_input(
             
             logger.info(f"[{request_id}] ✓ Payload validation: PASSED")
             
-            # Save output to disk
+            # Save output to disk; with an image the payload is saved twice,
+            # so walk the model once and share the dict
             output_saver = get_output_saver()
-            saved_path = output_saver.save_layer0_output(prepared)
+            prepared_data = prepared.model_dump() if image_processing_output else None
+            saved_path = output_saver.save_layer0_output(prepared, prepared_data)
             if saved_path:
                 logger.info(f"[{request_id}] ✓ Layer0 output saved to: {saved_path}")
             
             # Save media processing output if present
             if image_processing_output:
-                saved_media_path = output_saver.save_media_output(prepared)
+                saved_media_path = output_saver.save_media_output(prepared, prepared_data)
                 if saved_media_path:
                     logger.info(f"[{request_id}] ✓ Image analysis saved to: {saved_media_path}")
             
@@ -575,7 +657,7 @@ async def prepare_text_input(
         raise
     except Exception as e:
         logger.error(f"Error processing request: {e}", exc_info=True)
-        total_time = (time.time() - start_time) * 1000
+        total_time = (time.perf_counter_ns() - start_time) / 1_000_000
         return create_error_response(str(e), prep_time_ms=total_time)
 
 
@@ -604,12 +686,12 @@ async def prepare_media_input(
     3. Extract and process emojis
     4. Package payload
     """
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     step_times = {}
     
     try:
         # Step 1: Parse and validate
-        step_start = time.time()
+        step_start = time.perf_counter_ns()
         
         valid, error = validate_request(user_prompt)
         if not valid:
@@ -621,11 +703,9 @@ async def prepare_media_input(
             filename = image.filename
             temp_image_path = str(settings.get_file_path(filename))
             
-            with open(temp_image_path, "wb") as f:
-                content = await image.read()
-                f.write(content)
+            size_bytes = await save_upload(image, temp_image_path)
             
-            logger.info(f"Image uploaded: {filename} ({len(content)} bytes)")
+            logger.info(f"Image uploaded: {filename} ({size_bytes} bytes)")
             image_path = temp_image_path
         
         parsed = parse_and_validate(
@@ -634,41 +714,41 @@ async def prepare_media_input(
         )
         
         request_id = parsed["request_id"]
-        step_times["parse_validate"] = (time.time() - step_start) * 1000
+        step_times["parse_validate"] = (time.perf_counter_ns() - step_start) / 1_000_000
         
         with RequestLogger(request_id, logger) as req_logger:
             # Step 2: Normalize text and extract emojis
-            step_start = time.time()
+            step_start = time.perf_counter_ns()
             normalized_user, user_emojis, user_emoji_descs = normalize_text(
                 parsed["raw_user"],
                 preserve_emojis=True
             )
-            step_times["normalization"] = (time.time() - step_start) * 1000
+            step_times["normalization"] = (time.perf_counter_ns() - step_start) / 1_000_000
             req_logger.log_step("normalization", step_times["normalization"])
             
             # Step 3: Process media
-            step_start = time.time()
+            step_start = time.perf_counter_ns()
             image_dict, emoji_summary = process_media(
                 image_path=parsed["raw_image"] if parsed["validation"]["image_valid"] else None,
                 emojis=user_emojis,
                 emoji_descriptions=user_emoji_descs
             )
-            step_times["media_processing"] = (time.time() - step_start) * 1000
+            step_times["media_processing"] = (time.perf_counter_ns() - step_start) / 1_000_000
             req_logger.log_step("media_processing", step_times["media_processing"])
             
             # Step 4: Calculate stats (minimal for media endpoint)
-            step_start = time.time()
+            step_start = time.perf_counter_ns()
             stats = calculate_tokens_and_stats(
                 user_text=normalized_user,
                 external_chunks=[],
                 file_chunks_count=0,
                 extracted_total_chars=0
             )
-            step_times["token_calculation"] = (time.time() - step_start) * 1000
+            step_times["token_calculation"] = (time.perf_counter_ns() - step_start) / 1_000_000
             
             # Step 5: Package payload
-            step_start = time.time()
-            total_time = (time.time() - start_time) * 1000
+            step_start = time.perf_counter_ns()
+            total_time = (time.perf_counter_ns() - start_time) / 1_000_000
             
             prepared = package_payload(
                 normalized_user=normalized_user,
@@ -686,7 +766,7 @@ async def prepare_media_input(
                 prep_time_ms=total_time,
                 step_times=step_times
             )
-            step_times["packaging"] = (time.time() - step_start) * 1000
+            step_times["packaging"] = (time.perf_counter_ns() - step_start) / 1_000_000
             
             # Validate payload
             valid_payload, payload_error = validate_payload(prepared)
@@ -728,20 +808,21 @@ async def prepare_media_input(
         raise
     except Exception as e:
         logger.error(f"Error processing media request: {e}", exc_info=True)
-        total_time = (time.time() - start_time) * 1000
+        total_time = (time.perf_counter_ns() - start_time) / 1_000_000
         return create_error_response(str(e), prep_time_ms=total_time)
 
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Serve the web interface."""
-    try:
-        from pathlib import Path
-        html_path = Path(__file__).parent / "static" / "index.html"
-        if html_path.exists():
-            return html_path.read_text()
-        else:
-            return """
+# Web interface page, read once at startup and served from memory; browsers
+# revalidate with its ETag and get a bodyless 304 while it is unchanged
+INDEX_HTML_PATH = Path(__file__).parent / "static" / "index.html"
+try:
+    INDEX_HTML = INDEX_HTML_PATH.read_bytes()
+    INDEX_ETAG = '"' + hashlib.blake2b(INDEX_HTML, digest_size=8).hexdigest() + '"'
+except OSError:
+    INDEX_HTML = INDEX_ETAG = None
+INDEX_HEADERS = {"ETag": INDEX_ETAG or "", "Cache-Control": "public, max-age=60"}
+
+ROOT_FALLBACK_HTML = """
             <html>
                 <body>
                     <h1>LLM-Protect Input Preparation API</h1>
@@ -753,9 +834,16 @@ async def root():
                 </body>
             </html>
             """.format(settings.API_VERSION)
-    except Exception as e:
-        logger.error(f"Error serving root: {e}")
-        return HTMLResponse(f"<h1>Error: {e}</h1>", status_code=500)
+
+
+@app.get("/", response_class=HTMLResponse)
+async def root(request: Request):
+    """Serve the web interface."""
+    if INDEX_HTML is None:
+        return ROOT_FALLBACK_HTML
+    if request.headers.get("if-none-match") == INDEX_ETAG:
+        return Response(status_code=304, headers=INDEX_HEADERS)
+    return Response(content=INDEX_HTML, media_type="text/html", headers=INDEX_HEADERS)
 
 
 @app.post(
@@ -776,7 +864,7 @@ async def generate_llm_response(request: GenerateRequest):
     This endpoint receives the output from /prepare-text and uses it to
     generate a response with the Gemma 2B model.
     """
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     
     try:
         # Extract the prepared data
@@ -836,7 +924,7 @@ async def generate_llm_response(request: GenerateRequest):
             "hmac_signatures": len(prepared.text_embed_stub.hmacs),
         }
         
-        total_time = (time.time() - start_time) * 1000
+        total_time = (time.perf_counter_ns() - start_time) / 1_000_000
         
         # DETAILED LOG: Show generation results
         logger.info(f"[{prepared.metadata.request_id}] ===== LLM GENERATION COMPLETE =====")
@@ -872,7 +960,7 @@ async def generate_llm_response(request: GenerateRequest):
             generated_text="",
             input_tokens=0,
             output_tokens=0,
-            total_time_ms=(time.time() - start_time) * 1000,
+            total_time_ms=(time.perf_counter_ns() - start_time) / 1_000_000,
             error=str(e)
         )
 
@@ -1038,26 +1126,21 @@ async def prepare_layer0(
     - Special character masking
     - Raw text snapshot storage
     """
-    import json
-    import uuid
-    from datetime import datetime
-    
-    start_time = time.time()
-    request_id = str(uuid.uuid4())
+    start_time = time.perf_counter_ns()
+    request_id = generate_request_id()
     timestamp = datetime.utcnow().isoformat() + 'Z'
     
     # Parse external data
     external_data_list = []
     if external_data:
         try:
-            external_data_list = json.loads(external_data)
+            external_data_list = json_loads(external_data)
         except json.JSONDecodeError:
             external_data_list = [external_data]
     
     # Handle file upload
     file_text = ""
     if file and file.filename:
-        from pathlib import Path
         filename = file.filename
         
         if not settings.is_allowed_extension(filename):
@@ -1067,19 +1150,16 @@ async def prepare_layer0(
             )
         
         temp_file_path = str(settings.get_file_path(filename))
-        with open(temp_file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        await save_upload(file, temp_file_path)
         
         try:
-            file_chunks, file_info = extract_file_text(temp_file_path)
+            file_chunks, file_info = await asyncio.to_thread(extract_file_text, temp_file_path)
             if file_chunks:
                 file_text = ' '.join([chunk.content for chunk in file_chunks])
         except Exception as e:
             logger.error(f"File extraction failed: {e}")
     
     # Normalize and combine texts
-    from app.services.text_normalizer import normalize_text
     normalized_user, user_emojis, user_emoji_descs = normalize_text(user_prompt)
     
     normalized_external = []
@@ -1092,7 +1172,6 @@ async def prepare_layer0(
         normalized_external.append(norm_file)
     
     # RAG processing
-    from app.services.rag_handler import process_rag_data
     external_chunks, hmacs, rag_enabled = process_rag_data(
         user_prompt=user_prompt,
         external_data=external_data_list,
@@ -1102,12 +1181,12 @@ async def prepare_layer0(
     )
     
     # Token calculation
-    from app.services.token_processor import estimate_tokens
     token_count = estimate_tokens(normalized_user + ' '.join(normalized_external))
     char_total = len(normalized_user) + sum(len(ext) for ext in normalized_external)
     
-    # Prepare Layer 0 output
-    layer0_output = prepare_layer0_output(
+    # Prepare Layer 0 output in a worker thread (CPU-bound)
+    layer0_output = await asyncio.to_thread(
+        prepare_layer0_output,
         request_id=request_id,
         timestamp=timestamp,
         user_text=normalized_user,
@@ -1118,7 +1197,7 @@ async def prepare_layer0(
         token_count=token_count,
         char_total=char_total,
         attachment_texts=[],  # Would come from images
-        prep_time_ms=(time.time() - start_time) * 1000,
+        prep_time_ms=(time.perf_counter_ns() - start_time) / 1_000_000,
         store_raw_snapshot=True
     )
     
@@ -1159,11 +1238,8 @@ async def process_images_advanced(
     - Steganography detection (LSB analysis, entropy)
     - PDF embedded image extraction and processing
     """
-    import uuid
-    from datetime import datetime
-    
-    start_time = time.time()
-    request_id = str(uuid.uuid4())
+    start_time = time.perf_counter_ns()
+    request_id = generate_request_id()
     timestamp = datetime.utcnow().isoformat() + 'Z'
     
     image_paths = []
@@ -1171,33 +1247,38 @@ async def process_images_advanced(
     
     # Save uploaded images
     if images:
-        for img_file in images:
-            if img_file.filename:
-                filename = img_file.filename
-                
-                if not settings.is_image_file(filename):
-                    continue
-                
-                temp_path = str(settings.get_file_path(filename))
-                with open(temp_path, "wb") as f:
-                    content = await img_file.read()
-                    f.write(content)
-                
-                image_paths.append(temp_path)
+        valid_images = [
+            img_file for img_file in images
+            if img_file.filename and settings.is_image_file(img_file.filename)
+        ]
+        
+        # Request id and index keep uploads that share a filename from
+        # being written to the same file
+        image_paths = [
+            str(settings.get_file_path(f"{request_id[:8]}_{index}_{img_file.filename}"))
+            for index, img_file in enumerate(valid_images)
+        ]
+        
+        # Reads and writes both run in threads; save all uploads concurrently,
+        # letting every save finish before cleaning up after a failed one
+        results = await asyncio.gather(*(
+            save_upload(img_file, temp_path)
+            for img_file, temp_path in zip(valid_images, image_paths)
+        ), return_exceptions=True)
+        failure = next((r for r in results if isinstance(r, BaseException)), None)
+        if failure is not None:
+            await asyncio.to_thread(_remove_files, image_paths)
+            raise failure
     
     # Save PDF if provided
     if pdf_file and pdf_file.filename:
         filename = pdf_file.filename
         temp_path = str(settings.get_file_path(filename))
-        
-        with open(temp_path, "wb") as f:
-            content = await pdf_file.read()
-            f.write(content)
+        await save_upload(pdf_file, temp_path)
         
         pdf_path = temp_path
     
     # Extract emojis from prompt
-    from app.services.text_normalizer import extract_emojis, get_emoji_descriptions
     emojis = extract_emojis(user_prompt)
     emoji_descs = get_emoji_descriptions(emojis)
     
@@ -1207,8 +1288,9 @@ async def process_images_advanced(
         descriptions=emoji_descs
     )
     
-    # Process images
-    image_output = prepare_image_processing_output(
+    # Process images off the event loop (NumPy/Pillow release the GIL)
+    image_output = await asyncio.to_thread(
+        prepare_image_processing_output,
         request_id=request_id,
         timestamp=timestamp,
         image_paths=image_paths,
@@ -1235,7 +1317,8 @@ if __name__ == "__main__":
         "app.main:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
-        reload=True,
+        workers=settings.API_WORKERS,
+        reload=settings.API_WORKERS == 1,  # reload is single-process only
         log_level=settings.LOG_LEVEL.lower()
     )
 
@@ -7,11 +7,15 @@ and vision-based captioning for comprehensive image analysis.
 
 import os
 import io
-import hashlib
+import re
+import threading
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import Future
 from pathlib import Path
 from typing import Dict, Optional, Tuple, List, Any
 from app.utils.logger import get_logger
+from app.utils.hmac_utils import hash_file_sha256
 from app.config import settings
 
 logger = get_logger(__name__)
@@ -46,9 +50,50 @@ except ImportError:
     logger.warning("pytesseract not available. OCR disabled.")
 
 
+# Analysis results keyed by (file_hash, run_ocr, ocr_confidence_threshold).
+# Analysis is a pure function of the image bytes, so re-uploads of the same
+# image skip pHash/EXIF/OCR/entropy/LSB entirely.
+ANALYSIS_CACHE_MAX_SIZE = 256
+_analysis_cache: "OrderedDict[Tuple[str, bool, float], AdvancedImageAnalysis]" = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+# Analyses currently running, so concurrent requests for the same image
+# wait for the first one instead of all recomputing it
+_analysis_inflight: Dict[Tuple[str, bool, float], "Future[AdvancedImageAnalysis]"] = {}
+
+# pHash only looks at a 32x32 downscale, so JPEGs can be decoded at reduced
+# resolution (libjpeg DCT scaling) as long as they stay above this size.
+PHASH_DRAFT_SIZE = (256, 256)
+
+# Common text fields in EXIF
+EXIF_TEXT_KEYS = (
+    'ImageDescription', 'UserComment', 'XPComment',
+    'XPTitle', 'XPSubject', 'XPKeywords', 'Artist',
+    'Copyright', 'Software', 'Make', 'Model'
+)
+
+# Suspicious EXIF substrings fused into one case-insensitive alternation, so
+# each value is checked in a single scan instead of a lower() plus one
+# substring search per keyword
+_EXIF_SUSPICIOUS_RE = re.compile(
+    '|'.join(re.escape(p) for p in (
+        'ignore', 'system', 'override', '<', '>', 'script',
+        'base64', '===', 'admin', 'bypass'
+    )),
+    re.IGNORECASE
+)
+
+
 class AdvancedImageAnalysis:
     """Results from advanced image analysis."""
     
+    __slots__ = (
+        "file_hash", "phash", "exif_data", "exif_description",
+        "embedded_text_from_exif", "suspicious_metadata", "ocr_text",
+        "ocr_confidence", "stego_score", "file_entropy", "suspicious_entropy",
+        "extracted_payload", "caption", "vision_embedding", "dimensions",
+        "format", "size_bytes",
+    )
+    
     def __init__(
         self,
         file_hash: str,
@@ -126,13 +171,18 @@ def calculate_phash(image_path: str) -> Optional[str]:
     
     try:
         with Image.open(image_path) as img:
-            phash = imagehash.phash(img)
-            return str(phash)
+            img.draft('L', PHASH_DRAFT_SIZE)
+            return _phash_from_image(img)
     except Exception as e:
         logger.error(f"Failed to calculate pHash: {e}")
         return None
 
 
+def _phash_from_image(img: "Image.Image") -> str:
+    """Calculate pHash of an already opened image."""
+    return str(imagehash.phash(img))
+
+
 def calculate_phash_from_bytes(image_bytes: bytes) -> Optional[str]:
     """
     Calculate pHash from image bytes.
@@ -148,8 +198,8 @@ def calculate_phash_from_bytes(image_bytes: bytes) -> Optional[str]:
     
     try:
         with Image.open(io.BytesIO(image_bytes)) as img:
-            phash = imagehash.phash(img)
-            return str(phash)
+            img.draft('L', PHASH_DRAFT_SIZE)
+            return _phash_from_image(img)
     except Exception as e:
         logger.error(f"Failed to calculate pHash from bytes: {e}")
         return None
@@ -214,24 +264,14 @@ def extract_text_from_exif(exif_data: Dict) -> Tuple[Optional[str], bool]:
     text_fields = []
     suspicious = False
     
-    # Common text fields in EXIF
-    text_keys = [
-        'ImageDescription', 'UserComment', 'XPComment', 
-        'XPTitle', 'XPSubject', 'XPKeywords', 'Artist',
-        'Copyright', 'Software', 'Make', 'Model'
-    ]
-    
-    for key in text_keys:
+    for key in EXIF_TEXT_KEYS:
         if key in exif_data and exif_data[key]:
             value = str(exif_data[key])
             if value and len(value.strip()) > 0:
                 text_fields.append(f"{key}: {value}")
                 
-                # Check for suspicious patterns
-                if any(pattern in value.lower() for pattern in [
-                    'ignore', 'system', 'override', '<', '>', 'script',
-                    'base64', '===', 'admin', 'bypass'
-                ]):
+                # Check for suspicious patterns (once one value hits, the rest need not)
+                if not suspicious and _EXIF_SUSPICIOUS_RE.search(value) is not None:
                     suspicious = True
     
     combined_text = ' | '.join(text_fields) if text_fields else None
@@ -256,33 +296,38 @@ def perform_ocr(image_path: str, confidence_threshold: float = 50.0) -> Tuple[Op
     
     try:
         with Image.open(image_path) as img:
-            # Get detailed OCR data with confidence
-            ocr_data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
-            
-            # Filter by confidence and extract text
-            confident_text = []
-            confidences = []
-            
-            for i in range(len(ocr_data['text'])):
-                text = ocr_data['text'][i].strip()
-                conf = float(ocr_data['conf'][i])
-                
-                if text and conf >= confidence_threshold:
-                    confident_text.append(text)
-                    confidences.append(conf)
-            
-            if confident_text:
-                extracted_text = ' '.join(confident_text)
-                avg_confidence = sum(confidences) / len(confidences)
-                return extracted_text, avg_confidence
-            else:
-                return None, None
+            return _ocr_from_image(img, confidence_threshold)
     
     except Exception as e:
         logger.error(f"OCR failed: {e}")
         return None, None
 
 
+def _ocr_from_image(img: "Image.Image", confidence_threshold: float) -> Tuple[Optional[str], Optional[float]]:
+    """Perform OCR on an already opened image."""
+    # Get detailed OCR data with confidence
+    ocr_data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
+    
+    # Filter by confidence and extract text
+    confident_text = []
+    confidences = []
+    
+    for i in range(len(ocr_data['text'])):
+        text = ocr_data['text'][i].strip()
+        conf = float(ocr_data['conf'][i])
+        
+        if text and conf >= confidence_threshold:
+            confident_text.append(text)
+            confidences.append(conf)
+    
+    if confident_text:
+        extracted_text = ' '.join(confident_text)
+        avg_confidence = sum(confidences) / len(confidences)
+        return extracted_text, avg_confidence
+    
+    return None, None
+
+
 def calculate_image_entropy(image_path: str) -> Optional[float]:
     """
     Calculate Shannon entropy of image data.
@@ -300,28 +345,33 @@ def calculate_image_entropy(image_path: str) -> Optional[float]:
     
     try:
         with Image.open(image_path) as img:
-            # Convert to grayscale for simpler analysis
-            img_gray = img.convert('L')
-            
-            # Get pixel data
-            pixels = np.array(img_gray)
-            
-            # Calculate histogram
-            histogram, _ = np.histogram(pixels, bins=256, range=(0, 256))
-            
-            # Calculate probabilities
-            histogram = histogram / histogram.sum()
-            
-            # Calculate Shannon entropy
-            entropy = -np.sum(histogram * np.log2(histogram + 1e-10))
-            
-            return float(entropy)
+            return _entropy_from_image(img)
     
     except Exception as e:
         logger.error(f"Failed to calculate entropy: {e}")
         return None
 
 
+def _entropy_from_image(img: "Image.Image") -> float:
+    """Calculate Shannon entropy of an already opened image."""
+    # Convert to grayscale for simpler analysis
+    img_gray = img.convert('L')
+    
+    # Get pixel data (uint8 view of the decoded buffer, no extra copy)
+    pixels = np.asarray(img_gray)
+    
+    # Calculate histogram (single counting pass over the uint8 values)
+    histogram = np.bincount(pixels.ravel(), minlength=256)
+    
+    # Calculate probabilities
+    histogram = histogram / histogram.sum()
+    
+    # Calculate Shannon entropy
+    entropy = -np.sum(histogram * np.log2(histogram + 1e-10))
+    
+    return float(entropy)
+
+
 def detect_lsb_steganography(image_path: str) -> Tuple[float, Optional[str]]:
     """
     Detect potential LSB (Least Significant Bit) steganography.
@@ -339,48 +389,56 @@ def detect_lsb_steganography(image_path: str) -> Tuple[float, Optional[str]]:
     
     try:
         with Image.open(image_path) as img:
-            # Convert to RGB
-            img_rgb = img.convert('RGB')
-            pixels = np.array(img_rgb)
-            
-            # Extract LSBs from each channel
-            lsb_data = pixels & 1
-            
-            # Flatten to 1D
-            lsb_flat = lsb_data.flatten()
-            
-            # Calculate randomness of LSBs (chi-square test approximation)
-            ones = np.sum(lsb_flat)
-            zeros = len(lsb_flat) - ones
-            expected = len(lsb_flat) / 2
-            
-            # Chi-square statistic
-            chi_square = ((ones - expected) ** 2 + (zeros - expected) ** 2) / expected
-            
-            # Normalize to 0-1 score (higher = more suspicious)
-            # Threshold based on typical chi-square values
-            stego_score = min(chi_square / 100.0, 1.0)
-            
-            # Try to extract potential hidden message from LSBs
-            # (This is a simplified extraction - real stego uses more complex encoding)
-            extracted_payload = None
-            if stego_score > 0.6:
-                # Try to extract first 100 bytes as ASCII
-                try:
-                    lsb_bytes = np.packbits(lsb_flat[:800])  # 100 bytes
-                    decoded = lsb_bytes.tobytes().decode('ascii', errors='ignore')
-                    if any(c.isprintable() and c not in ' \n\r\t' for c in decoded):
-                        extracted_payload = decoded[:100]
-                except:
-                    pass
-            
-            return float(stego_score), extracted_payload
+            return _lsb_from_image(img)
     
     except Exception as e:
         logger.error(f"LSB detection failed: {e}")
         return 0.0, None
 
 
+def _lsb_from_image(img: "Image.Image") -> Tuple[float, Optional[str]]:
+    """Run the LSB steganography heuristic on an already opened image."""
+    # Convert to RGB
+    img_rgb = img.convert('RGB')
+    pixels = np.asarray(img_rgb)
+    
+    # Extract LSBs from each channel (stays uint8, one byte per sample)
+    lsb_data = pixels & 1
+    
+    # Flatten to 1D (lsb_data is contiguous, so this is a view)
+    lsb_flat = lsb_data.ravel()
+    
+    # Calculate randomness of LSBs (chi-square test approximation)
+    # count_nonzero is a popcount-style reduction, no int64 upcast like sum()
+    total = lsb_flat.size
+    ones = np.count_nonzero(lsb_flat)
+    zeros = total - ones
+    expected = total / 2
+    
+    # Chi-square statistic
+    chi_square = ((ones - expected) ** 2 + (zeros - expected) ** 2) / expected
+    
+    # Normalize to 0-1 score (higher = more suspicious)
+    # Threshold based on typical chi-square values
+    stego_score = min(chi_square / 100.0, 1.0)
+    
+    # Try to extract potential hidden message from LSBs
+    # (This is a simplified extraction - real stego uses more complex encoding)
+    extracted_payload = None
+    if stego_score > 0.6:
+        # Try to extract first 100 bytes as ASCII
+        try:
+            lsb_bytes = np.packbits(lsb_flat[:800])  # 100 bytes
+            # Visible ASCII (0x21-0x7E) check done on the array, not per char
+            if np.any((lsb_bytes > 0x20) & (lsb_bytes < 0x7F)):
+                decoded = lsb_bytes.tobytes().decode('ascii', errors='ignore')
+                extracted_payload = decoded[:100]
+        except:
+            pass
+    
+    return float(stego_score), extracted_payload
+
+
 def analyze_image_advanced(
     image_path: str,
     run_ocr: bool = False,
@@ -400,44 +458,111 @@ def analyze_image_advanced(
     if not os.path.exists(image_path):
         raise FileNotFoundError(f"Image not found: {image_path}")
     
-    # Calculate file hash
-    with open(image_path, 'rb') as f:
-        file_hash = hashlib.sha256(f.read()).hexdigest()
+    # Calculate file hash (streamed, the file is never held in memory whole)
+    file_hash = hash_file_sha256(image_path)
+    
+    cache_key = (file_hash, run_ocr, ocr_confidence_threshold)
+    is_owner = False
+    with _analysis_cache_lock:
+        cached = _analysis_cache.get(cache_key)
+        if cached is not None:
+            _analysis_cache.move_to_end(cache_key)
+        else:
+            future = _analysis_inflight.get(cache_key)
+            if future is None:
+                future = Future()
+                _analysis_inflight[cache_key] = future
+                is_owner = True
+    
+    if cached is not None:
+        logger.debug(f"Advanced image analysis cache hit: {file_hash[:16]}")
+        return cached
+    
+    if not is_owner:
+        logger.debug(f"Waiting for in-flight image analysis: {file_hash[:16]}")
+        return future.result()
     
+    try:
+        analysis = _analyze_image_uncached(
+            image_path, file_hash, run_ocr, ocr_confidence_threshold
+        )
+    except BaseException as e:
+        with _analysis_cache_lock:
+            _analysis_inflight.pop(cache_key, None)
+        future.set_exception(e)
+        raise
+    
+    with _analysis_cache_lock:
+        _analysis_cache[cache_key] = analysis
+        if len(_analysis_cache) > ANALYSIS_CACHE_MAX_SIZE:
+            _analysis_cache.popitem(last=False)
+        _analysis_inflight.pop(cache_key, None)
+    future.set_result(analysis)
+    
+    return analysis
+
+
+def _analyze_image_uncached(
+    image_path: str,
+    file_hash: str,
+    run_ocr: bool,
+    ocr_confidence_threshold: float
+) -> AdvancedImageAnalysis:
+    """Run the full analysis pipeline for an image (no cache lookup)."""
     # Get basic image info
     dimensions = None
     image_format = None
     size_bytes = os.path.getsize(image_path)
     
+    phash = None
+    ocr_text = None
+    ocr_confidence = None
+    file_entropy = None
+    stego_score, extracted_payload = 0.0, None
+    
+    # Decode the image once and run every pixel-based analysis on it
     if PILLOW_AVAILABLE:
         try:
             with Image.open(image_path) as img:
                 dimensions = img.size
                 image_format = img.format or "unknown"
+                img.load()
+                
+                # Calculate pHash
+                if IMAGEHASH_AVAILABLE:
+                    try:
+                        phash = _phash_from_image(img)
+                    except Exception as e:
+                        logger.error(f"Failed to calculate pHash: {e}")
+                
+                # OCR (optional - resource intensive)
+                if run_ocr and PYTESSERACT_AVAILABLE:
+                    try:
+                        ocr_text, ocr_confidence = _ocr_from_image(img, ocr_confidence_threshold)
+                    except Exception as e:
+                        logger.error(f"OCR failed: {e}")
+                
+                # Calculate entropy
+                try:
+                    file_entropy = _entropy_from_image(img)
+                except Exception as e:
+                    logger.error(f"Failed to calculate entropy: {e}")
+                
+                # LSB steganography detection
+                try:
+                    stego_score, extracted_payload = _lsb_from_image(img)
+                except Exception as e:
+                    logger.error(f"LSB detection failed: {e}")
         except Exception as e:
             logger.error(f"Failed to read image info: {e}")
     
-    # Calculate pHash
-    phash = calculate_phash(image_path)
+    suspicious_entropy = file_entropy is not None and file_entropy > 7.5
     
     # Extract EXIF
     exif_data = extract_exif_metadata(image_path)
     embedded_text, suspicious_metadata = extract_text_from_exif(exif_data)
     exif_description = exif_data.get('ImageDescription')
     
-    # OCR (optional - resource intensive)
-    ocr_text = None
-    ocr_confidence = None
-    if run_ocr:
-        ocr_text, ocr_confidence = perform_ocr(image_path, ocr_confidence_threshold)
-    
-    # Calculate entropy
-    file_entropy = calculate_image_entropy(image_path)
-    suspicious_entropy = file_entropy is not None and file_entropy > 7.5
-    
-    # LSB steganography detection
-    stego_score, extracted_payload = detect_lsb_steganography(image_path)
-    
     # Placeholder for vision caption (would require transformer model)
     caption = None
     vision_embedding = None
@@ -445,7 +570,7 @@ def analyze_image_advanced(
     logger.info(
         f"Advanced image analysis complete: "
         f"phash={phash is not None}, exif_fields={len(exif_data)}, "
-        f"entropy={file_entropy:.2f if file_entropy else 0}, "
+        f"entropy={file_entropy or 0:.2f}, "
         f"stego_score={stego_score:.2f}"
     )
     
@@ -470,6 +595,12 @@ def analyze_image_advanced(
     )
 
 
+def clear_analysis_cache() -> None:
+    """Drop all cached advanced image analysis results."""
+    with _analysis_cache_lock:
+        _analysis_cache.clear()
+
+
 def check_libraries_available() -> Dict[str, bool]:
     """
     Check which advanced image processing libraries are available.
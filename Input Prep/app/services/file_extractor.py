@@ -5,6 +5,7 @@ Extracts text from various file formats (TXT, MD, PDF, DOCX) and chunks it
 for efficient processing.
 """
 
+import hashlib
 import os
 from pathlib import Path
 from typing import List, Optional, Dict, Any
@@ -30,6 +31,30 @@ except ImportError:
     PYTHON_DOCX_AVAILABLE = False
     logger.warning("python-docx not available. DOCX extraction will be disabled.")
 
+# Extracted-image filenames only need a short content tag, not a
+# cryptographic digest; xxh3 hashes at memory speed
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+    logger.info("xxhash not available. Extracted image names use blake2b.")
+
+
+def short_content_hash(data: bytes) -> str:
+    """
+    Short non-cryptographic tag for naming content-addressed files.
+    
+    Args:
+        data: Content bytes
+    
+    Returns:
+        12 hex characters
+    """
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_hexdigest(data)[:12]
+    return hashlib.blake2b(data, digest_size=6).hexdigest()
+
 
 def check_library_availability() -> Dict[str, bool]:
     """
@@ -134,17 +159,13 @@ def extract_images_from_pdf(file_path: str, output_dir: Optional[str] = None) ->
     if not PYMUPDF_AVAILABLE:
         raise ImportError("PyMuPDF is not installed. Install with: pip install PyMuPDF")
     
-    from pathlib import Path as PathLib
-    import hashlib
-    
     extracted_images = []
     
     if output_dir is None:
         # Use temp_media directory
-        from app.config import settings
-        output_dir = settings.MEDIA_TEMP_DIR / f"pdf_images_{PathLib(file_path).stem}"
+        output_dir = settings.MEDIA_TEMP_DIR / f"pdf_images_{Path(file_path).stem}"
     
-    output_path = PathLib(output_dir)
+    output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
     try:
@@ -162,7 +183,7 @@ def extract_images_from_pdf(file_path: str, output_dir: Optional[str] = None) ->
                     image_ext = base_image["ext"]
                     
                     # Calculate hash for unique filename
-                    img_hash = hashlib.md5(image_bytes).hexdigest()[:12]
+                    img_hash = short_content_hash(image_bytes)
                     
                     # Save image
                     image_filename = f"page{page_num}_img{img_index}_{img_hash}.{image_ext}"
@@ -6,7 +6,8 @@ obfuscation attempts, and suspicious payloads.
 """
 
 import re
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -15,6 +16,13 @@ logger = get_logger(__name__)
 class HeuristicFlags:
     """Container for heuristic detection flags."""
     
+    __slots__ = (
+        "has_long_base64", "has_system_delimiter", "has_repeated_chars",
+        "has_long_single_line", "has_xml_tags", "has_html_comments",
+        "has_suspicious_keywords", "has_many_delimiters", "suspicious_score",
+        "detected_patterns",
+    )
+    
     def __init__(
         self,
         has_long_base64: bool = False,
@@ -93,8 +101,52 @@ SUSPICIOUS_KEYWORDS = [
     r'bypass\s+(?:security|filter|restriction)',
 ]
 
+# Delimiter-like runs counted by detect_many_delimiters
+DELIMITER_RUNS = ('###', '---', '===', '***', '|||', '<<<', '>>>')
+
+# Only the first HEURISTICS_SAMPLE_CHARS characters are screened
+HEURISTICS_SAMPLE_CHARS = 10000
+
+# Number of distinct samples whose check results are memoized
+HEURISTICS_CACHE_SIZE = 1024
+
+# Default thresholds for the parameterized detectors
+BASE64_MIN_LENGTH = 50
+REPEATED_CHARS_MIN = 20
+
+# Patterns compiled once at import rather than on every call
+_DELIMITER_PATTERNS = [(d, re.compile(d, re.IGNORECASE)) for d in SYSTEM_DELIMITERS]
+_KEYWORD_PATTERNS = [(k, re.compile(k, re.IGNORECASE)) for k in SUSPICIOUS_KEYWORDS]
+
+# Each list fused into one alternation: clean text (the common case) is
+# rejected after a single scan instead of one scan per pattern. They stay
+# on re: RE2's \s, \b and case folding are narrower than re's Unicode
+# semantics, so an RE2 prefilter could reject text the per-pattern checks flag
+_ANY_DELIMITER_RE = re.compile('|'.join(f'(?:{d})' for d in SYSTEM_DELIMITERS), re.IGNORECASE)
+_ANY_KEYWORD_RE = re.compile('|'.join(f'(?:{k})' for k in SUSPICIOUS_KEYWORDS), re.IGNORECASE)
+
+# Tag name followed by whitespace or '>'. A tag runs to the first '>' after
+# its name, so that '>' is found with str.find in count_xml_tags rather than
+# by a regex attribute run, which would rescan the rest of an unclosed text
+# from every '<' (quadratic on input like '<a b <a b <a b ...')
+_XML_TAG_START_RE = re.compile(r'</?[a-zA-Z][a-zA-Z0-9]*(?=[\s>])')
+
 
-def detect_long_base64(text: str, min_length: int = 50) -> bool:
+def _base64_pattern(min_length: int) -> re.Pattern:
+    """Build the base64 run pattern for a minimum length."""
+    return re.compile(r'[A-Za-z0-9+/]{' + str(min_length) + r',}={0,2}')
+
+
+def _repeated_chars_pattern(min_repeats: int) -> re.Pattern:
+    """Build the repeated-character pattern for a minimum run."""
+    return re.compile(r'(.)\1{' + str(min_repeats - 1) + r',}')
+
+
+_BASE64_RE = _base64_pattern(BASE64_MIN_LENGTH)
+_REPEATED_CHARS_RE = _repeated_chars_pattern(REPEATED_CHARS_MIN)
+
+
+def detect_long_base64(text: str, min_length: int = BASE64_MIN_LENGTH) -> bool:
     """
     Detect suspiciously long base64-encoded sequences.
     
@@ -106,10 +158,11 @@ def detect_long_base64(text: str, min_length: int = 50) -> bool:
         True if long base64 sequence found
     """
     # Base64 pattern: alphanumeric + + / and optional = padding
-    base64_pattern = re.compile(r'[A-Za-z0-9+/]{' + str(min_length) + r',}={0,2}')
-    matches = base64_pattern.findall(text)
-    
-    return len(matches) > 0
+    if min_length == BASE64_MIN_LENGTH:
+        base64_pattern = _BASE64_RE
+    else:
+        base64_pattern = _base64_pattern(min_length)
+    return base64_pattern.search(text) is not None
 
 
 def detect_system_delimiters(text: str) -> List[str]:
@@ -123,17 +176,18 @@ def detect_system_delimiters(text: str) -> List[str]:
         List of detected delimiter patterns
     """
     detected = []
-    text_lower = text.lower()
     
-    for delimiter in SYSTEM_DELIMITERS:
-        pattern = re.compile(delimiter, re.IGNORECASE)
-        if pattern.search(text):
+    if _ANY_DELIMITER_RE.search(text) is None:
+        return detected
+    
+    for delimiter, pattern in _DELIMITER_PATTERNS:
+        if pattern.search(text) is not None:
             detected.append(delimiter)
     
     return detected
 
 
-def detect_repeated_chars(text: str, min_repeats: int = 20) -> bool:
+def detect_repeated_chars(text: str, min_repeats: int = REPEATED_CHARS_MIN) -> bool:
     """
     Detect suspiciously repeated characters.
     
@@ -145,10 +199,11 @@ def detect_repeated_chars(text: str, min_repeats: int = 20) -> bool:
         True if many repeated characters found
     """
     # Pattern for same character repeated many times
-    pattern = re.compile(r'(.)\1{' + str(min_repeats - 1) + r',}')
-    matches = pattern.findall(text)
-    
-    return len(matches) > 0
+    if min_repeats == REPEATED_CHARS_MIN:
+        pattern = _REPEATED_CHARS_RE
+    else:
+        pattern = _repeated_chars_pattern(min_repeats)
+    return pattern.search(text) is not None
 
 
 def detect_long_single_line(text: str, max_length: int = 500) -> bool:
@@ -162,6 +217,11 @@ def detect_long_single_line(text: str, max_length: int = 500) -> bool:
     Returns:
         True if long single line found
     """
+    # No line can exceed the limit if the whole text doesn't; skips
+    # splitting (and allocating every line) for typical short prompts
+    if len(text) <= max_length:
+        return False
+    
     lines = text.split('\n')
     for line in lines:
         if len(line) > max_length:
@@ -170,6 +230,45 @@ def detect_long_single_line(text: str, max_length: int = 500) -> bool:
     return False
 
 
+def count_xml_tags(text: str, limit: int) -> int:
+    """
+    Count XML-like tags, stopping at limit.
+    
+    Matches what </?name(?:\\s[^>]*)?>(?!</|>) would find with finditer, in
+    linear time: every tag start before the same '>' reuses one lookup.
+    
+    Args:
+        text: Text to analyze
+        limit: Stop counting once this many tags are found
+    
+    Returns:
+        Number of tags found, at most limit
+    """
+    count = 0
+    pos = 0
+    close = -1
+    while count < limit:
+        start = _XML_TAG_START_RE.search(text, pos)
+        if start is None:
+            break
+        
+        name_end = start.end()
+        if close < name_end:
+            close = text.find('>', name_end)
+            if close == -1:
+                # No '>' left, so no later tag can close either
+                break
+        
+        after = close + 1
+        if text.startswith('</', after) or text.startswith('>', after):
+            pos = start.start() + 1
+        else:
+            count += 1
+            pos = after
+    
+    return count
+
+
 def detect_xml_tags(text: str) -> bool:
     """
     Detect XML-like tags that might be injection attempts.
@@ -181,14 +280,11 @@ def detect_xml_tags(text: str) -> bool:
         True if XML tags found
     """
     # Simple XML tag pattern
-    xml_pattern = re.compile(r'</?[a-zA-Z][a-zA-Z0-9]*(?:\s+[^>]*)?>(?!</|>)')
-    matches = xml_pattern.findall(text)
+    # Filter out common safe tags in small quantities: only whether a third
+    # tag exists matters, so stop counting there
+    tag_count = count_xml_tags(text, 3)
     
-    # Filter out common safe tags in small quantities
-    if len(matches) <= 2:
-        return False
-    
-    return True
+    return tag_count > 2
 
 
 def detect_html_comments(text: str) -> bool:
@@ -201,10 +297,11 @@ def detect_html_comments(text: str) -> bool:
     Returns:
         True if HTML comments found
     """
-    html_comment_pattern = re.compile(r'<!--.*?-->', re.DOTALL)
-    matches = html_comment_pattern.findall(text)
+    # Equivalent to searching for <!--.*?--> with DOTALL, but linear: a
+    # regex retries from every unclosed '<!--' to the end of the text
+    start = text.find('<!--')
     
-    return len(matches) > 0
+    return start != -1 and text.find('-->', start + 4) != -1
 
 
 def detect_suspicious_keywords(text: str) -> List[str]:
@@ -218,11 +315,14 @@ def detect_suspicious_keywords(text: str) -> List[str]:
         List of detected suspicious patterns
     """
     detected = []
-    text_lower = text.lower()
     
-    for keyword in SUSPICIOUS_KEYWORDS:
-        pattern = re.compile(keyword, re.IGNORECASE)
-        if pattern.search(text_lower):
+    # The patterns are case-insensitive already, so the text is searched
+    # as is rather than through a lowercased copy of the whole sample
+    if _ANY_KEYWORD_RE.search(text) is None:
+        return detected
+    
+    for keyword, pattern in _KEYWORD_PATTERNS:
+        if pattern.search(text) is not None:
             detected.append(keyword)
     
     return detected
@@ -239,15 +339,47 @@ def detect_many_delimiters(text: str, threshold: int = 5) -> bool:
     Returns:
         True if many delimiters found
     """
-    delimiters = ['###', '---', '===', '***', '|||', '<<<', '>>>']
     count = 0
     
-    for delimiter in delimiters:
+    # Stop at the first run type that reaches the threshold; the remaining
+    # full-text counts cannot change the answer
+    for delimiter in DELIMITER_RUNS:
         count += text.count(delimiter)
+        if count >= threshold:
+            return True
     
     return count >= threshold
 
 
+# Weight of each flag in the suspiciousness score, in bit order
+SCORE_WEIGHTS = (
+    ("has_long_base64", 0.2),
+    ("has_system_delimiter", 0.3),
+    ("has_repeated_chars", 0.1),
+    ("has_long_single_line", 0.15),
+    ("has_xml_tags", 0.1),
+    ("has_html_comments", 0.15),
+    ("has_suspicious_keywords", 0.4),
+    ("has_many_delimiters", 0.2),
+)
+
+
+def _build_score_table() -> Tuple[float, ...]:
+    """Precompute the capped score for every combination of flags."""
+    table = []
+    for combo in range(1 << len(SCORE_WEIGHTS)):
+        score = 0.0
+        for bit, (_, weight) in enumerate(SCORE_WEIGHTS):
+            if combo >> bit & 1:
+                score += weight
+        table.append(min(score, 1.0))
+    return tuple(table)
+
+
+# Capped score indexed by the flag bitmask (2^8 entries)
+_SCORE_TABLE = _build_score_table()
+
+
 def calculate_suspicious_score(flags: HeuristicFlags) -> float:
     """
     Calculate an overall suspiciousness score from flags.
@@ -258,48 +390,36 @@ def calculate_suspicious_score(flags: HeuristicFlags) -> float:
     Returns:
         Score from 0.0 (clean) to 1.0 (very suspicious)
     """
-    score = 0.0
-    
-    # Weight different flags
-    if flags.has_long_base64:
-        score += 0.2
-    if flags.has_system_delimiter:
-        score += 0.3
-    if flags.has_repeated_chars:
-        score += 0.1
-    if flags.has_long_single_line:
-        score += 0.15
-    if flags.has_xml_tags:
-        score += 0.1
-    if flags.has_html_comments:
-        score += 0.15
-    if flags.has_suspicious_keywords:
-        score += 0.4
-    if flags.has_many_delimiters:
-        score += 0.2
-    
-    # Cap at 1.0
-    return min(score, 1.0)
+    # Weighted sums are precomputed per flag combination; build the
+    # combination index from the booleans and look the score up
+    combo = (
+        bool(flags.has_long_base64)
+        | bool(flags.has_system_delimiter) << 1
+        | bool(flags.has_repeated_chars) << 2
+        | bool(flags.has_long_single_line) << 3
+        | bool(flags.has_xml_tags) << 4
+        | bool(flags.has_html_comments) << 5
+        | bool(flags.has_suspicious_keywords) << 6
+        | bool(flags.has_many_delimiters) << 7
+    )
+    return _SCORE_TABLE[combo]
 
 
-def run_fast_heuristics(text: str) -> HeuristicFlags:
+@lru_cache(maxsize=HEURISTICS_CACHE_SIZE)
+def _run_checks(text_sample: str) -> Tuple[Tuple[bool, ...], Tuple[str, ...]]:
     """
-    Run all fast heuristic checks on text.
+    Run every heuristic check on an already-truncated sample.
     
-    This is designed to be VERY fast (< 5ms) for pre-Layer 0 screening.
+    Results are cached by sample text, since the same prompts (system
+    prompts, common queries) recur across requests. The return value is
+    immutable so cached entries cannot be changed by callers.
     
     Args:
-        text: Text to analyze
+        text_sample: Text to analyze (at most HEURISTICS_SAMPLE_CHARS long)
     
     Returns:
-        HeuristicFlags with all detection results
+        Tuple of (flag values in HeuristicFlags order, detected patterns)
     """
-    if not text:
-        return HeuristicFlags(suspicious_score=0.0)
-    
-    # Only analyze first 10k chars for speed
-    text_sample = text[:10000]
-    
     detected_patterns = []
     
     # Run all checks
@@ -337,7 +457,48 @@ def run_fast_heuristics(text: str) -> HeuristicFlags:
     if has_many_delimiters:
         detected_patterns.append("many_delimiters")
     
-    # Create flags object
+    checks = (
+        has_long_base64,
+        has_system_delimiter,
+        has_repeated_chars,
+        has_long_single_line,
+        has_xml_tags,
+        has_html_comments,
+        has_suspicious_keywords,
+        has_many_delimiters,
+    )
+    return checks, tuple(detected_patterns)
+
+
+def run_fast_heuristics(text: str) -> HeuristicFlags:
+    """
+    Run all fast heuristic checks on text.
+    
+    This is designed to be VERY fast (< 5ms) for pre-Layer 0 screening.
+    
+    Args:
+        text: Text to analyze
+    
+    Returns:
+        HeuristicFlags with all detection results
+    """
+    if not text:
+        return HeuristicFlags(suspicious_score=0.0)
+    
+    # Only analyze first 10k chars for speed
+    checks, detected_patterns = _run_checks(text[:HEURISTICS_SAMPLE_CHARS])
+    
+    # Create flags object (fresh per call; the cached tuple stays untouched)
+    (
+        has_long_base64,
+        has_system_delimiter,
+        has_repeated_chars,
+        has_long_single_line,
+        has_xml_tags,
+        has_html_comments,
+        has_suspicious_keywords,
+        has_many_delimiters,
+    ) = checks
     flags = HeuristicFlags(
         has_long_base64=has_long_base64,
         has_system_delimiter=has_system_delimiter,
@@ -347,7 +508,7 @@ def run_fast_heuristics(text: str) -> HeuristicFlags:
         has_html_comments=has_html_comments,
         has_suspicious_keywords=has_suspicious_keywords,
         has_many_delimiters=has_many_delimiters,
-        detected_patterns=detected_patterns
+        detected_patterns=list(detected_patterns)
     )
     
     # Calculate suspiciousness score
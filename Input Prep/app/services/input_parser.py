@@ -15,6 +15,19 @@ from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+def generate_request_id() -> str:
+    """
+    Generate a unique request ID.
+    
+    Clients and output filenames rely on the dashed 36-character UUID
+    format, so IDs stay random UUID4 strings.
+    
+    Returns:
+        Request ID string
+    """
+    return str(uuid.uuid4())
+
+
 def parse_and_validate(
     user_prompt: str,
     file_path: Optional[str] = None,
@@ -43,7 +56,7 @@ def parse_and_validate(
         True
     """
     # Generate request ID
-    request_id = str(uuid.uuid4())
+    request_id = generate_request_id()
     
     # Generate timestamp
     timestamp = datetime.utcnow().isoformat() + 'Z'
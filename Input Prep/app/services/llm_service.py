@@ -4,6 +4,7 @@ LLM service for generating responses using Gemma 2B.
 Integrates with Hugging Face transformers to run the LLM locally.
 """
 
+import time
 from typing import Optional, Dict, Any
 import torch
 from app.utils.logger import get_logger
@@ -112,8 +113,7 @@ def generate_response(
             "total_time_ms": 0
         }
     
-    import time
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     
     try:
         # Load model if not already loaded
@@ -148,7 +148,7 @@ def generate_response(
             generated_text = generated_text[len(prompt):].strip()
         
         output_tokens = outputs[0].shape[0] - input_tokens
-        total_time = (time.time() - start_time) * 1000
+        total_time = (time.perf_counter_ns() - start_time) / 1_000_000
         
         logger.info(f"Generation complete: {output_tokens} tokens in {total_time:.2f}ms")
         
@@ -162,7 +162,7 @@ def generate_response(
         }
         
     except Exception as e:
-        total_time = (time.time() - start_time) * 1000
+        total_time = (time.perf_counter_ns() - start_time) / 1_000_000
         logger.error(f"Generation failed: {e}")
         return {
             "success": False,
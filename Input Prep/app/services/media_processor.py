@@ -9,6 +9,7 @@ and temporary media storage for further layer processing.
 import os
 import shutil
 import json
+from io import BytesIO
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, List, Tuple, Any
@@ -120,7 +121,6 @@ def extract_image_metadata_from_bytes(
     
     # Open image from bytes
     try:
-        from io import BytesIO
         with Image.open(BytesIO(image_bytes)) as img:
             image_format = img.format or "unknown"
             dimensions = img.size
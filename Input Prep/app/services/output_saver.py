@@ -8,7 +8,7 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, Any
 from app.models.schemas import PreparedInput
 from app.utils.logger import get_logger
 
@@ -83,12 +83,17 @@ class OutputSaver:
         
         return filename
     
-    def save_layer0_output(self, prepared: PreparedInput) -> Optional[Path]:
+    def save_layer0_output(
+        self,
+        prepared: PreparedInput,
+        prepared_data: Optional[Dict[str, Any]] = None
+    ) -> Optional[Path]:
         """
         Save Layer 0 (text processing) output to disk.
         
         Args:
             prepared: PreparedInput object from /prepare-text endpoint
+            prepared_data: prepared.model_dump(), if the caller already has it
         
         Returns:
             Path to saved file, or None if save failed
@@ -101,7 +106,7 @@ class OutputSaver:
             output_data = {
                 "processing_type": "layer0_text",
                 "saved_at": datetime.utcnow().isoformat() + 'Z',
-                "prepared_input": prepared.model_dump()
+                "prepared_input": prepared_data if prepared_data is not None else prepared.model_dump()
             }
             
             with open(output_path, 'w', encoding='utf-8') as f:
@@ -116,12 +121,17 @@ class OutputSaver:
             logger.error(f"Failed to save Layer 0 output: {e}", exc_info=True)
             return None
     
-    def save_media_output(self, prepared: PreparedInput) -> Optional[Path]:
+    def save_media_output(
+        self,
+        prepared: PreparedInput,
+        prepared_data: Optional[Dict[str, Any]] = None
+    ) -> Optional[Path]:
         """
         Save media processing output to disk.
         
         Args:
             prepared: PreparedInput object from /prepare-media endpoint
+            prepared_data: prepared.model_dump(), if the caller already has it
         
         Returns:
             Path to saved file, or None if save failed
@@ -134,7 +144,7 @@ class OutputSaver:
             output_data = {
                 "processing_type": "media_processing",
                 "saved_at": datetime.utcnow().isoformat() + 'Z',
-                "prepared_input": prepared.model_dump()
+                "prepared_input": prepared_data if prepared_data is not None else prepared.model_dump()
             }
             
             with open(output_path, 'w', encoding='utf-8') as f:
@@ -5,7 +5,6 @@ Combines all processed data into the final PreparedInput format
 with complete metadata and timing information.
 """
 
-import uuid
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from app.models.schemas import (
@@ -19,6 +18,7 @@ from app.models.schemas import (
     Layer0Output,
     ImageProcessingOutput
 )
+from app.services.input_parser import generate_request_id
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -99,7 +99,7 @@ def package_payload(
     """
     # Generate request ID if not provided
     if request_id is None:
-        request_id = str(uuid.uuid4())
+        request_id = generate_request_id()
     
     # Create timestamp
     timestamp = datetime.utcnow().isoformat() + 'Z'
@@ -176,7 +176,7 @@ def create_error_response(
     from app.models.schemas import StatsInfo, EmojiSummary
     
     if request_id is None:
-        request_id = str(uuid.uuid4())
+        request_id = generate_request_id()
     
     # Create minimal stats
     stats = StatsInfo(
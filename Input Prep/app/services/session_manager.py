@@ -7,8 +7,10 @@ responses like ChatGPT. Sessions are stored in-memory with automatic cleanup.
 
 import time
 import uuid
+from collections import deque
+from itertools import islice
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 from threading import Lock
 from app.utils.logger import get_logger
 
@@ -18,6 +20,9 @@ logger = get_logger(__name__)
 class ConversationMessage:
     """Represents a single message in a conversation."""
     
+    # Sessions hold many messages; avoid a per-instance __dict__
+    __slots__ = ("role", "content", "timestamp")
+    
     def __init__(self, role: str, content: str, timestamp: Optional[float] = None):
         """
         Initialize a conversation message.
@@ -47,15 +52,17 @@ class ConversationMessage:
 class ConversationSession:
     """Represents a conversation session with history."""
     
-    def __init__(self, session_id: str):
+    def __init__(self, session_id: str, max_messages: Optional[int] = None):
         """
         Initialize a conversation session.
         
         Args:
             session_id: Unique session identifier
+            max_messages: Keep only this many recent messages (None = unbounded)
         """
         self.session_id = session_id
-        self.messages: List[ConversationMessage] = []
+        # Bounded deque drops the oldest message in O(1) once full
+        self.messages: Deque[ConversationMessage] = deque(maxlen=max_messages)
         self.created_at = time.time()
         self.last_access = time.time()
     
@@ -84,8 +91,9 @@ class ConversationSession:
         """
         self.last_access = time.time()
         if limit:
-            return self.messages[-limit:]
-        return self.messages
+            start = max(len(self.messages) - limit, 0)
+            return list(islice(self.messages, start, None))
+        return list(self.messages)
     
     def get_formatted_history(self, limit: Optional[int] = None) -> str:
         """
@@ -111,7 +119,7 @@ class ConversationSession:
     
     def clear(self):
         """Clear all messages in the session."""
-        self.messages = []
+        self.messages.clear()
         self.last_access = time.time()
         logger.info(f"Cleared session {self.session_id[:8]}")
     
@@ -183,7 +191,9 @@ class SessionManager:
         """
         with self.lock:
             session_id = str(uuid.uuid4())
-            self.sessions[session_id] = ConversationSession(session_id)
+            self.sessions[session_id] = ConversationSession(
+                session_id, max_messages=self.max_messages_per_session
+            )
             logger.info(f"Created session: {session_id[:8]}...")
             self._cleanup_if_needed()
             return session_id
@@ -220,14 +230,10 @@ class SessionManager:
                 logger.warning(f"Session not found: {session_id[:8]}...")
                 return False
             
+            # Session deque is bounded by max_messages_per_session and
+            # drops the oldest message itself
             session.add_message(role, content)
             
-            # Trim old messages if exceeding limit
-            if len(session.messages) > self.max_messages_per_session:
-                removed = len(session.messages) - self.max_messages_per_session
-                session.messages = session.messages[-self.max_messages_per_session:]
-                logger.debug(f"Trimmed {removed} old messages from session {session_id[:8]}")
-            
             return True
     
     def get_context(
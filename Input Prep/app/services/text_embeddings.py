@@ -5,7 +5,11 @@ Uses sentence-transformers to generate compact embeddings for text analysis.
 """
 
 import hashlib
+from functools import lru_cache
 from typing import Optional, Tuple
+
+import numpy as np
+
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -22,6 +26,12 @@ except ImportError:
 _model = None
 MODEL_NAME = "all-MiniLM-L6-v2"  # Lightweight, fast model
 
+# Fingerprints of recently embedded texts. The same prompt and RAG chunks
+# reach the model again through retries and through both /prepare-text and
+# /prepare-layer0; longer texts are not worth keeping as cache keys.
+EMBEDDING_CACHE_SIZE = 256
+EMBEDDING_CACHE_MAX_CHARS = 20000
+
 
 def get_embedding_model() -> Optional[SentenceTransformer]:
     """
@@ -66,22 +76,32 @@ def generate_text_embedding(text: str) -> Optional[str]:
         return None
     
     try:
-        # Generate embedding
-        embedding = model.encode(text, convert_to_numpy=True)
-        
-        # Create hash of embedding vector for compact fingerprint
-        embedding_bytes = embedding.tobytes()
-        embedding_hash = hashlib.sha256(embedding_bytes).hexdigest()[:32]
-        
-        logger.debug(f"Generated embedding hash: {embedding_hash} (shape: {embedding.shape})")
-        
-        return embedding_hash
+        if len(text) <= EMBEDDING_CACHE_MAX_CHARS:
+            return _embedding_fingerprint_cached(model, text)
+        return _embedding_fingerprint(model, text)
     
     except Exception as e:
         logger.error(f"Failed to generate text embedding: {e}")
         return None
 
 
+def _embedding_fingerprint(model: "SentenceTransformer", text: str) -> str:
+    """Embed text and hash the vector (uncached body of generate_text_embedding)."""
+    embedding = model.encode(text, convert_to_numpy=True)
+    
+    # Create hash of embedding vector for compact fingerprint
+    # (hash the array buffer directly instead of copying it via tobytes())
+    embedding_hash = hashlib.sha256(np.ascontiguousarray(embedding)).hexdigest()[:32]
+    
+    logger.debug(f"Generated embedding hash: {embedding_hash} (shape: {embedding.shape})")
+    
+    return embedding_hash
+
+
+# Failures raise and are not cached; an unavailable model never gets here
+_embedding_fingerprint_cached = lru_cache(maxsize=EMBEDDING_CACHE_SIZE)(_embedding_fingerprint)
+
+
 def generate_text_embedding_with_vector(text: str) -> Optional[Tuple[str, list]]:
     """
     Generate embedding fingerprint and return full vector.
@@ -90,7 +110,7 @@ def generate_text_embedding_with_vector(text: str) -> Optional[Tuple[str, list]]
         text: Text to embed
     
     Returns:
-        Tuple of (hash, vector_list) or None if failed
+        Tuple of (hash, vector) or None if failed
     """
     if not text or not text.strip():
         return None
@@ -104,15 +124,12 @@ def generate_text_embedding_with_vector(text: str) -> Optional[Tuple[str, list]]
         embedding = model.encode(text, convert_to_numpy=True)
         
         # Create hash
-        embedding_bytes = embedding.tobytes()
-        embedding_hash = hashlib.sha256(embedding_bytes).hexdigest()[:32]
+        embedding_hash = hashlib.sha256(np.ascontiguousarray(embedding)).hexdigest()[:32]
         
-        # Convert to list for JSON serialization
-        embedding_list = embedding.tolist()
-        
-        logger.debug(f"Generated embedding: hash={embedding_hash}, dim={len(embedding_list)}")
+        logger.debug(f"Generated embedding: hash={embedding_hash}, dim={embedding.shape[-1]}")
         
-        return embedding_hash, embedding_list
+        # Convert to list for JSON serialization
+        return embedding_hash, embedding.tolist()
     
     except Exception as e:
         logger.error(f"Failed to generate text embedding with vector: {e}")
@@ -135,14 +152,13 @@ def calculate_embedding_similarity(text1: str, text2: str) -> Optional[float]:
         return None
     
     try:
-        # Generate embeddings
-        embeddings = model.encode([text1, text2], convert_to_numpy=True)
+        # Generate unit-length embeddings so cosine similarity is a single dot
+        embeddings = model.encode(
+            [text1, text2], convert_to_numpy=True, normalize_embeddings=True
+        )
         
         # Calculate cosine similarity
-        from numpy import dot
-        from numpy.linalg import norm
-        
-        similarity = dot(embeddings[0], embeddings[1]) / (norm(embeddings[0]) * norm(embeddings[1]))
+        similarity = np.dot(embeddings[0], embeddings[1])
         
         logger.debug(f"Embedding similarity: {similarity:.4f}")
         
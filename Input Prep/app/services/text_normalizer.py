@@ -7,7 +7,10 @@ and handling emoji extraction and description.
 
 import re
 import unicodedata
-from typing import List, Tuple, Dict
+from typing import Iterable, List, Tuple, Dict
+
+import numpy as np
+
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -20,6 +23,25 @@ except ImportError:
     EMOJI_AVAILABLE = False
     logger.warning("emoji library not available. Emoji processing will be limited.")
 
+# Texts at least this long find distinct non-ASCII code points with NumPy
+NUMPY_SCAN_MIN_LENGTH = 4096
+
+
+def _non_ascii_chars(text: str) -> Iterable[str]:
+    """
+    Distinct non-ASCII characters of text (the only emoji candidates).
+    
+    Args:
+        text: Text to scan
+    
+    Returns:
+        Iterable of unique characters with code point >= 0x80
+    """
+    if len(text) >= NUMPY_SCAN_MIN_LENGTH:
+        codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+        return map(chr, np.unique(codes[codes >= 0x80]).tolist())
+    return (char for char in set(text) if char >= '\x80')
+
 
 def normalize_whitespace(text: str) -> str:
     """
@@ -109,13 +131,11 @@ def extract_emojis(text: str) -> List[str]:
         found_emojis = emoji_pattern.findall(text)
         return list(set(found_emojis))
     
-    # Use emoji library if available
-    emojis = []
-    for char in text:
-        if emoji.is_emoji(char):
-            emojis.append(char)
+    # Single-character emojis are all non-ASCII; check each distinct one once
+    if text.isascii():
+        return []
     
-    return list(set(emojis))
+    return [char for char in _non_ascii_chars(text) if emoji.is_emoji(char)]
 
 
 def demojize_text(text: str) -> str:
@@ -198,11 +218,20 @@ def remove_control_characters(text: str) -> str:
         >>> remove_control_characters("Hello\\x00World")
         'HelloWorld'
     """
-    # Keep newline, carriage return, and tab
-    return ''.join(
-        char for char in text
-        if unicodedata.category(char)[0] != 'C' or char in '\n\r\t'
-    )
+    # Printable text has no category C characters at all
+    if text.isprintable():
+        return text
+    
+    # Classify each distinct character once, then delete in a single
+    # translate pass (keep newline, carriage return, and tab)
+    deletions = {
+        ord(char): None for char in set(text)
+        if unicodedata.category(char)[0] == 'C' and char not in '\n\r\t'
+    }
+    if not deletions:
+        return text
+    
+    return text.translate(deletions)
 
 
 def normalize_text(text: str, preserve_emojis: bool = True) -> Tuple[str, List[str], List[str]]:
@@ -5,14 +5,17 @@ Detects zero-width characters, invisible characters, homoglyphs,
 preserves raw text snapshots, and tracks Unicode normalization changes.
 """
 
+import re
 import unicodedata
+from functools import lru_cache
+from itertools import repeat
 from typing import Tuple, Dict, List, Optional
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 # Zero-width and invisible characters to detect
-ZERO_WIDTH_CHARS = {
+ZERO_WIDTH_CHARS = frozenset({
     '\u200B',  # Zero Width Space
     '\u200C',  # Zero Width Non-Joiner
     '\u200D',  # Zero Width Joiner
@@ -23,10 +26,10 @@ ZERO_WIDTH_CHARS = {
     '\u2064',  # Invisible Plus
     '\uFEFF',  # Zero Width No-Break Space (BOM)
     '\u180E',  # Mongolian Vowel Separator
-}
+})
 
 # Additional suspicious invisible characters
-INVISIBLE_CHARS = {
+INVISIBLE_CHARS = frozenset({
     '\u00A0',  # No-Break Space
     '\u1680',  # Ogham Space Mark
     '\u2000',  # En Quad
@@ -43,12 +46,35 @@ INVISIBLE_CHARS = {
     '\u202F',  # Narrow No-Break Space
     '\u205F',  # Medium Mathematical Space
     '\u3000',  # Ideographic Space
-}
+})
+
+# Deletion table for str.translate, built once at import
+_REMOVE_TABLE = dict.fromkeys(map(ord, ZERO_WIDTH_CHARS | INVISIBLE_CHARS))
+
+# Character-class scanners: one C-level pass instead of a Python loop per char
+_ZERO_WIDTH_RE = re.compile('[' + ''.join(map(re.escape, sorted(ZERO_WIDTH_CHARS))) + ']')
+_INVISIBLE_RE = re.compile('[' + ''.join(map(re.escape, sorted(INVISIBLE_CHARS))) + ']')
+
+# Number of distinct texts whose analysis is memoized, and the longest
+# text that is cached (bounds the cache's memory)
+UNICODE_CACHE_SIZE = 512
+UNICODE_CACHE_MAX_CHARS = 20000
+
+# The special char mask is pure ASCII, so finding its 'Z' markers is a fast
+# literal search rather than a character-class test per position
+_MASK_ZERO_WIDTH_RE = re.compile('Z')
 
 
 class UnicodeAnalysisResult:
     """Results from Unicode obfuscation detection."""
     
+    __slots__ = (
+        "original_text", "normalized_text", "zero_width_removed",
+        "special_char_mask", "zero_width_found", "invisible_chars_found",
+        "unicode_obfuscation_flag", "zero_width_count", "invisible_count",
+        "zero_width_positions", "unicode_diff", "normalization_changes",
+    )
+    
     def __init__(
         self,
         original_text: str,
@@ -105,10 +131,10 @@ def detect_zero_width_chars(text: str) -> Tuple[List[int], int]:
     Returns:
         Tuple of (positions, count) where zero-width chars were found
     """
-    positions = []
-    for i, char in enumerate(text):
-        if char in ZERO_WIDTH_CHARS:
-            positions.append(i)
+    if text.isascii():
+        return [], 0
+    
+    positions = [m.start() for m in _ZERO_WIDTH_RE.finditer(text)]
     
     return positions, len(positions)
 
@@ -123,10 +149,10 @@ def detect_invisible_chars(text: str) -> Tuple[List[int], int]:
     Returns:
         Tuple of (positions, count) where invisible chars were found
     """
-    positions = []
-    for i, char in enumerate(text):
-        if char in INVISIBLE_CHARS:
-            positions.append(i)
+    if text.isascii():
+        return [], 0
+    
+    positions = [m.start() for m in _INVISIBLE_RE.finditer(text)]
     
     return positions, len(positions)
 
@@ -141,12 +167,10 @@ def remove_zero_width_chars(text: str) -> str:
     Returns:
         Text with zero-width characters removed
     """
-    result = []
-    for char in text:
-        if char not in ZERO_WIDTH_CHARS and char not in INVISIBLE_CHARS:
-            result.append(char)
+    if text.isascii():
+        return text
     
-    return ''.join(result)
+    return text.translate(_REMOVE_TABLE)
 
 
 def create_special_char_mask(text: str) -> str:
@@ -165,28 +189,37 @@ def create_special_char_mask(text: str) -> str:
     Returns:
         Mask string of same length as input
     """
-    mask = []
-    for char in text:
+    if text.isascii():
+        return '.' * len(text)
+    
+    # Classify each distinct character once, then map the whole text through
+    # the resulting table with a single dict lookup per position
+    classes = {}
+    for char in set(text):
         if char in ZERO_WIDTH_CHARS:
-            mask.append('Z')
+            classes[char] = 'Z'
         elif char in INVISIBLE_CHARS:
-            mask.append('I')
+            classes[char] = 'I'
         elif ord(char) > 127 and (char.isalpha() or char.isdigit()):
             # Potential homoglyph (non-ASCII letter/digit)
-            mask.append('H')
-        else:
-            mask.append('.')
+            classes[char] = 'H'
     
-    return ''.join(mask)
+    return ''.join(map(classes.get, text, repeat('.')))
 
 
-def calculate_unicode_diff(original: str, normalized: str) -> str:
+def calculate_unicode_diff(
+    original: str,
+    normalized: str,
+    diff_positions: Optional[List[int]] = None
+) -> str:
     """
     Calculate a compact representation of changes from Unicode normalization.
     
     Args:
         original: Original text before normalization
         normalized: Text after NFKC normalization
+        diff_positions: Precomputed positions where the texts differ, if the
+            caller already has them
     
     Returns:
         Summary of differences
@@ -194,14 +227,11 @@ def calculate_unicode_diff(original: str, normalized: str) -> str:
     if original == normalized:
         return "no_changes"
     
-    changes = []
-    min_len = min(len(original), len(normalized))
-    
     # Find positions where chars differ
-    diff_positions = []
-    for i in range(min_len):
-        if original[i] != normalized[i]:
-            diff_positions.append(i)
+    if diff_positions is None:
+        diff_positions = [
+            i for i, (a, b) in enumerate(zip(original, normalized)) if a != b
+        ]
     
     # Check length difference
     len_diff = len(normalized) - len(original)
@@ -222,6 +252,68 @@ def calculate_unicode_diff(original: str, normalized: str) -> str:
     return diff_summary
 
 
+def _analyze_non_ascii(text: str) -> Tuple[str, str, str, Tuple[int, ...], int, str, int]:
+    """
+    Scan and normalize non-ASCII text for analyze_unicode_obfuscation.
+    
+    Args:
+        text: Non-empty, non-ASCII text
+    
+    Returns:
+        Tuple of (special_char_mask, zero_width_removed, normalized_text,
+        zero-width positions, invisible count, unicode_diff,
+        normalization_changes); immutable so cached entries stay intact
+    """
+    # Create special character mask (on original text). It classifies every
+    # character once, so the zero-width and invisible positions are read
+    # back off the mask instead of scanning the text again.
+    special_char_mask = create_special_char_mask(text)
+    
+    # Detect zero-width and invisible characters
+    zw_positions = [m.start() for m in _MASK_ZERO_WIDTH_RE.finditer(special_char_mask)]
+    inv_count = special_char_mask.count('I')
+    
+    # Remove zero-width and invisible chars
+    zero_width_removed = remove_zero_width_chars(text)
+    
+    # Unicode normalization (NFKC). The quick check answers for almost all
+    # real text, in which case there is nothing to normalize or diff.
+    if unicodedata.is_normalized('NFKC', zero_width_removed):
+        normalized_text = zero_width_removed
+        unicode_diff = "no_changes"
+        normalization_changes = 0
+    else:
+        normalized_text = unicodedata.normalize('NFKC', zero_width_removed)
+        
+        # One pass over the character pairs feeds both the diff and the count
+        diff_positions = [
+            i for i, (a, b) in enumerate(zip(zero_width_removed, normalized_text)) if a != b
+        ]
+        
+        # Calculate Unicode diff
+        unicode_diff = calculate_unicode_diff(zero_width_removed, normalized_text, diff_positions)
+        
+        # Count normalization changes
+        normalization_changes = len(diff_positions)
+        # Account for length differences
+        normalization_changes += abs(len(normalized_text) - len(zero_width_removed))
+    
+    return (
+        special_char_mask,
+        zero_width_removed,
+        normalized_text,
+        tuple(zw_positions),
+        inv_count,
+        unicode_diff,
+        normalization_changes,
+    )
+
+
+# Clients resend the same prompts and RAG chunks, and the analysis is a
+# pure function of the text, so results for repeated texts are reused
+_analyze_non_ascii_cached = lru_cache(maxsize=UNICODE_CACHE_SIZE)(_analyze_non_ascii)
+
+
 def analyze_unicode_obfuscation(text: str) -> UnicodeAnalysisResult:
     """
     Comprehensive Unicode obfuscation analysis.
@@ -256,35 +348,42 @@ def analyze_unicode_obfuscation(text: str) -> UnicodeAnalysisResult:
             normalization_changes=0
         )
     
+    # Fast path: every zero-width/invisible/homoglyph candidate is non-ASCII
+    # and NFKC leaves ASCII untouched, so pure-ASCII text needs no scanning.
+    if text.isascii():
+        return UnicodeAnalysisResult(
+            original_text=text,
+            normalized_text=text,
+            zero_width_removed=text,
+            special_char_mask='.' * len(text),
+            zero_width_found=False,
+            invisible_chars_found=False,
+            unicode_obfuscation_flag=False,
+            zero_width_count=0,
+            invisible_count=0,
+            zero_width_positions=[],
+            unicode_diff="no_changes",
+            normalization_changes=0
+        )
+    
     # Preserve raw snapshot
     original_text = text
     
-    # Detect zero-width characters
-    zw_positions, zw_count = detect_zero_width_chars(text)
-    
-    # Detect invisible characters
-    inv_positions, inv_count = detect_invisible_chars(text)
-    
-    # Remove zero-width and invisible chars
-    zero_width_removed = remove_zero_width_chars(text)
-    
-    # Create special character mask (on original text)
-    special_char_mask = create_special_char_mask(text)
-    
-    # Unicode normalization (NFKC)
-    normalized_text = unicodedata.normalize('NFKC', zero_width_removed)
-    
-    # Calculate Unicode diff
-    unicode_diff = calculate_unicode_diff(zero_width_removed, normalized_text)
-    
-    # Count normalization changes
-    normalization_changes = 0
-    if zero_width_removed != normalized_text:
-        normalization_changes = sum(
-            1 for a, b in zip(zero_width_removed, normalized_text) if a != b
-        )
-        # Account for length differences
-        normalization_changes += abs(len(normalized_text) - len(zero_width_removed))
+    # The scan/normalize work is memoized for texts up to a size limit
+    if len(text) <= UNICODE_CACHE_MAX_CHARS:
+        fields = _analyze_non_ascii_cached(text)
+    else:
+        fields = _analyze_non_ascii(text)
+    (
+        special_char_mask,
+        zero_width_removed,
+        normalized_text,
+        zw_positions,
+        inv_count,
+        unicode_diff,
+        normalization_changes,
+    ) = fields
+    zw_count = len(zw_positions)
     
     # Determine flags
     zero_width_found = zw_count > 0
@@ -313,7 +412,7 @@ def analyze_unicode_obfuscation(text: str) -> UnicodeAnalysisResult:
         unicode_obfuscation_flag=unicode_obfuscation_flag,
         zero_width_count=zw_count,
         invisible_count=inv_count,
-        zero_width_positions=zw_positions,
+        zero_width_positions=list(zw_positions),
         unicode_diff=unicode_diff,
         normalization_changes=normalization_changes
     )
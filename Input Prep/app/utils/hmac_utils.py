@@ -11,6 +11,16 @@ from typing import Optional
 from app.config import settings
 
 
+def _key_bytes(key: Optional[str]) -> bytes:
+    """Resolve and encode the signing key (settings key unless given)."""
+    secret_key = key if key is not None else settings.HMAC_SECRET_KEY
+    
+    if not secret_key:
+        raise ValueError("HMAC secret key is not configured")
+    
+    return secret_key.encode('utf-8')
+
+
 def generate_hmac(data: str, key: Optional[str] = None) -> str:
     """
     Generate HMAC-SHA256 signature for the given data.
@@ -27,16 +37,7 @@ def generate_hmac(data: str, key: Optional[str] = None) -> str:
         >>> len(signature)
         64
     """
-    secret_key = key if key is not None else settings.HMAC_SECRET_KEY
-    
-    if not secret_key:
-        raise ValueError("HMAC secret key is not configured")
-    
-    return hmac.new(
-        secret_key.encode('utf-8'),
-        data.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
+    return hmac.digest(_key_bytes(key), data.encode('utf-8'), 'sha256').hex()
 
 
 def verify_hmac(data: str, signature: str, key: Optional[str] = None) -> bool:
@@ -87,7 +88,12 @@ def sign_chunks(chunks: list[str], key: Optional[str] = None) -> list[str]:
         >>> len(signatures)
         3
     """
-    return [generate_hmac(chunk, key) for chunk in chunks]
+    if not chunks:
+        return []
+    
+    # Resolve the key once; hmac.digest is the one-shot C path (no HMAC object)
+    key_bytes = _key_bytes(key)
+    return [hmac.digest(key_bytes, chunk.encode('utf-8'), 'sha256').hex() for chunk in chunks]
 
 
 def verify_chunks(chunks: list[str], signatures: list[str], key: Optional[str] = None) -> list[bool]:
@@ -130,9 +136,12 @@ def hash_file_sha256(file_path: str) -> str:
         >>> hash_file_sha256("example.txt")
         'a3b2c1d4...'
     """
-    sha256_hash = hashlib.sha256()
-    
     with open(file_path, 'rb') as f:
+        # Python 3.11+: readinto a reusable buffer, no per-chunk bytes objects
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        
+        sha256_hash = hashlib.sha256()
         # Read file in 64KB chunks
         for chunk in iter(lambda: f.read(65536), b''):
             sha256_hash.update(chunk)
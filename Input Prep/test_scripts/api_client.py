@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP helpers for the API test scripts.
+
+Provides the pooled keep-alive session and the server probe that the
+scripts in this directory use.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_maxsize: int = 1) -> requests.Session:
+    """
+    Create a pooled, keep-alive session.
+    
+    Every call through the session reuses an open connection instead of
+    opening a new TCP connection per request.
+    
+    Args:
+        pool_maxsize: Connections kept open (raise for concurrent callers)
+    
+    Returns:
+        requests.Session with the pooled adapter mounted
+    """
+    session = requests.Session()
+    session.mount(
+        "http://",
+        HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+    )
+    return session
+
+
+def server_is_up(session: requests.Session, base_url: str) -> bool:
+    """
+    Probe the API once with a short timeout.
+    
+    Args:
+        session: Session to send the probe through
+        base_url: API base URL, e.g. http://localhost:8000/api/v1
+    
+    Returns:
+        True if the server answered
+    """
+    try:
+        session.get(f"{base_url}/model-status", timeout=2)
+        return True
+    except requests.exceptions.RequestException:
+        return False
@@ -14,21 +14,83 @@ import requests
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from api_client import create_session
+
 BASE_URL = "http://localhost:8000/api/v1"
-TIMEOUT = 10  # seconds
+# (connect, read) timeouts in seconds: connecting to a local server is
+# near-instant, so a down server fails fast instead of after the read timeout
+CONNECT_TIMEOUT = 0.5
+TIMEOUT = (CONNECT_TIMEOUT, 10)
+LLM_TIMEOUT = (CONNECT_TIMEOUT, 30)  # LLM can take longer
+
+# One pooled, keep-alive session for every request so the tests reuse a
+# TCP connection instead of opening a new one per call
+http_session = create_session(pool_maxsize=4)
+
+# Report decorations, built once
+RULE = "=" * 70
+PASS_TAG = f"{'✓ PASS':8}"
+FAIL_TAG = f"{'✗ FAIL':8}"
 
 def print_section(title):
-    print("\n" + "=" * 70)
-    print(f"  {title}")
-    print("=" * 70)
+    print(f"\n{RULE}\n  {title}\n{RULE}")
+
+def run_checks_concurrently(checks):
+    """
+    Run independent checks in parallel and print their output in order.
+    
+    Each check is given a log function instead of printing; its lines are
+    collected and printed once all checks finish, so the report reads
+    exactly as if they had run sequentially.
+    """
+    def run(check):
+        lines = []
+        try:
+            result = check(lines.append)
+        except Exception as e:
+            lines.append(f"   ✗ Error: {e}")
+            result = False
+        return result, lines
+    
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = {name: executor.submit(run, check) for name, check in checks.items()}
+    
+    results = {}
+    for name, future in futures.items():
+        result, lines = future.result()
+        for line in lines:
+            print(line)
+        results[name] = result
+    return results
+
+def api_call(method, path, parse=True, **kwargs):
+    """
+    Call an API endpoint and decode its JSON body.
+    
+    Args:
+        parse: Decode the body; pass False when only the status matters
+    
+    Returns:
+        Tuple of (data, error): the parsed body (None when parse is False)
+        on HTTP 200, otherwise None and a message describing the failure
+    """
+    kwargs.setdefault("timeout", TIMEOUT)
+    try:
+        response = http_session.request(method, f"{BASE_URL}{path}", **kwargs)
+        if response.status_code != 200:
+            return None, f"Failed with status {response.status_code}"
+        return (response.json() if parse else None), None
+    except Exception as e:
+        return None, f"Error: {e}"
 
 def test_server_running():
     """Test if server is responding."""
     print("\n1. Testing if server is running...")
     try:
-        response = requests.get(f"{BASE_URL}/model-status", timeout=TIMEOUT)
+        response = http_session.get(f"{BASE_URL}/model-status", timeout=TIMEOUT)
         status = response.json()
         print(f"   ✓ Server is running")
         print(f"   ✓ Model: {status.get('model_name', 'Unknown')}")
@@ -45,142 +107,138 @@ def test_server_running():
 def test_prepare_text():
     """Test /prepare-text endpoint."""
     print("\n2. Testing /prepare-text endpoint...")
-    try:
-        response = requests.post(
-            f"{BASE_URL}/prepare-text",
-            data={"user_prompt": "Hello, this is a test!"},
-            timeout=TIMEOUT
-        )
-        if response.status_code == 200:
-            prepared = response.json()
-            req_id = prepared['metadata']['request_id']
-            tokens = prepared['text_embed_stub']['stats']['token_estimate']
-            print(f"   ✓ Prepare-text works")
-            print(f"   ✓ Request ID: {req_id[:16]}...")
-            print(f"   ✓ Token estimate: {tokens}")
-            return prepared
-        else:
-            print(f"   ✗ Failed with status {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
+    prepared, error = api_call(
+        "POST", "/prepare-text", data={"user_prompt": "Hello, this is a test!"}
+    )
+    if error:
+        print(f"   ✗ {error}")
         return None
+    
+    req_id = prepared['metadata']['request_id']
+    tokens = prepared['text_embed_stub']['stats']['token_estimate']
+    print(f"   ✓ Prepare-text works")
+    print(f"   ✓ Request ID: {req_id[:16]}...")
+    print(f"   ✓ Token estimate: {tokens}")
+    return prepared
 
-def test_llm_generation(prepared):
+def test_llm_generation(prepared, log=print):
     """Test LLM generation."""
-    print("\n3. Testing LLM generation...")
+    log("\n3. Testing LLM generation...")
     try:
-        response = requests.post(
+        response = http_session.post(
             f"{BASE_URL}/generate",
             json={"prepared_input": prepared, "max_new_tokens": 50},
-            timeout=30  # LLM can take longer
+            timeout=LLM_TIMEOUT
         )
         if response.status_code == 200:
             result = response.json()
             if result.get('success'):
                 generated = result['generated_text']
-                print(f"   ✓ LLM generation works")
-                print(f"   ✓ Input tokens: {result['input_tokens']}")
-                print(f"   ✓ Output tokens: {result['output_tokens']}")
-                print(f"   ✓ Time: {result['total_time_ms']:.2f}ms")
-                print(f"   ✓ Generated: {generated[:80]}{'...' if len(generated) > 80 else ''}")
+                log(f"   ✓ LLM generation works")
+                log(f"   ✓ Input tokens: {result['input_tokens']}")
+                log(f"   ✓ Output tokens: {result['output_tokens']}")
+                log(f"   ✓ Time: {result['total_time_ms']:.2f}ms")
+                log(f"   ✓ Generated: {generated[:80]}{'...' if len(generated) > 80 else ''}")
                 return True
             else:
-                print(f"   ✗ Generation failed: {result.get('error', 'Unknown')}")
+                log(f"   ✗ Generation failed: {result.get('error', 'Unknown')}")
                 return False
         else:
-            print(f"   ✗ Failed with status {response.status_code}")
+            log(f"   ✗ Failed with status {response.status_code}")
             return False
     except requests.exceptions.Timeout:
-        print(f"   ✗ Timeout (LLM took too long)")
+        log(f"   ✗ Timeout (LLM took too long)")
         return False
     except Exception as e:
-        print(f"   ✗ Error: {e}")
+        log(f"   ✗ Error: {e}")
         return False
 
-def test_outputs_saved():
+def test_outputs_saved(log=print):
     """Test if outputs are being saved."""
-    print("\n4. Testing output saving...")
+    log("\n4. Testing output saving...")
     try:
         output_dir = Path("Outputs/layer0_text")
         if not output_dir.exists():
-            print(f"   ✗ Output directory doesn't exist: {output_dir}")
+            log(f"   ✗ Output directory doesn't exist: {output_dir}")
             return False
         
-        output_files = list(output_dir.glob("*.json"))
-        if len(output_files) > 0:
-            latest = max(output_files, key=lambda p: p.stat().st_mtime)
-            print(f"   ✓ Outputs are being saved")
-            print(f"   ✓ Total files: {len(output_files)}")
-            print(f"   ✓ Latest: {latest.name}")
+        # One scandir pass both counts the outputs and finds the newest;
+        # DirEntry caches its stat, so no extra per-file path lookups
+        file_count = 0
+        latest_name, latest_mtime = None, -1.0
+        with os.scandir(output_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                file_count += 1
+                mtime = entry.stat().st_mtime
+                if mtime > latest_mtime:
+                    latest_name, latest_mtime = entry.name, mtime
+        
+        if file_count > 0:
+            log(f"   ✓ Outputs are being saved")
+            log(f"   ✓ Total files: {file_count}")
+            log(f"   ✓ Latest: {latest_name}")
             return True
         else:
-            print(f"   ✗ No output files found in {output_dir}")
+            log(f"   ✗ No output files found in {output_dir}")
             return False
     except Exception as e:
-        print(f"   ✗ Error: {e}")
+        log(f"   ✗ Error: {e}")
         return False
 
-def test_vector_db():
+def test_vector_db(log=print):
     """Test vector database."""
-    print("\n5. Testing vector database...")
-    try:
-        db_path = Path("chroma_db")
-        if not db_path.exists():
-            print(f"   ✗ Vector DB not found at {db_path}")
-            print(f"   → Run: python3 populate_vector_db.py")
-            return False
-        
-        # Test with RAG query
-        response = requests.post(
-            f"{BASE_URL}/prepare-text",
-            data={
-                "user_prompt": "What is DSA?",
-                "retrieve_from_vector_db": "true"
-            },
-            timeout=TIMEOUT
-        )
-        
-        if response.status_code == 200:
-            prepared = response.json()
-            external_chunks = len(prepared['text_embed_stub']['normalized_external'])
-            if external_chunks > 0:
-                print(f"   ✓ Vector DB is working")
-                print(f"   ✓ Retrieved {external_chunks} documents")
-                return True
-            else:
-                print(f"   ⚠ Vector DB exists but no results retrieved")
-                print(f"   → DB might be empty, run: python3 populate_vector_db.py")
-                return False
-        else:
-            print(f"   ✗ Failed with status {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
+    log("\n5. Testing vector database...")
+    db_path = Path("chroma_db")
+    if not db_path.exists():
+        log(f"   ✗ Vector DB not found at {db_path}")
+        log(f"   → Run: python3 populate_vector_db.py")
+        return False
+    
+    # Test with RAG query
+    prepared, error = api_call(
+        "POST",
+        "/prepare-text",
+        data={
+            "user_prompt": "What is DSA?",
+            "retrieve_from_vector_db": "true"
+        }
+    )
+    if error:
+        log(f"   ✗ {error}")
         return False
+    
+    external_chunks = len(prepared['text_embed_stub']['normalized_external'])
+    if external_chunks > 0:
+        log(f"   ✓ Vector DB is working")
+        log(f"   ✓ Retrieved {external_chunks} documents")
+        return True
+    
+    log(f"   ⚠ Vector DB exists but no results retrieved")
+    log(f"   → DB might be empty, run: python3 populate_vector_db.py")
+    return False
 
-def test_conversation_session():
+def test_conversation_session(log=print):
     """Test session creation."""
-    print("\n6. Testing conversation sessions...")
-    try:
-        response = requests.post(f"{BASE_URL}/sessions/create", timeout=TIMEOUT)
-        if response.status_code == 200:
-            session = response.json()
-            session_id = session['session_id']
-            print(f"   ✓ Session creation works")
-            print(f"   ✓ Session ID: {session_id[:16]}...")
-            
-            # Test session info
-            response = requests.get(f"{BASE_URL}/sessions/{session_id}", timeout=TIMEOUT)
-            if response.status_code == 200:
-                print(f"   ✓ Session retrieval works")
-                return True
-        
-        print(f"   ✗ Failed with status {response.status_code}")
+    log("\n6. Testing conversation sessions...")
+    session_info, error = api_call("POST", "/sessions/create")
+    if error:
+        log(f"   ✗ {error}")
         return False
-    except Exception as e:
-        print(f"   ✗ Error: {e}")
+    
+    session_id = session_info['session_id']
+    log(f"   ✓ Session creation works")
+    log(f"   ✓ Session ID: {session_id[:16]}...")
+    
+    # Test session info
+    _, error = api_call("GET", f"/sessions/{session_id}", parse=False)
+    if error:
+        log(f"   ✗ {error}")
         return False
+    
+    log(f"   ✓ Session retrieval works")
+    return True
 
 def main():
     """Run all tests."""
@@ -191,41 +249,45 @@ def main():
     }
     
     if not results["Server Running"]:
-        print("\n" + "=" * 70)
+        print("\n" + RULE)
         print("❌ Server is not running. Start it with: bash start_server.sh")
-        print("=" * 70)
+        print(RULE)
         sys.exit(1)
     
     prepared = test_prepare_text()
     results["Prepare Text"] = prepared is not None
     
-    if prepared:
-        results["LLM Generation"] = test_llm_generation(prepared)
-    else:
-        results["LLM Generation"] = False
-    
-    results["Output Saving"] = test_outputs_saved()
-    results["Vector DB"] = test_vector_db()
-    results["Sessions"] = test_conversation_session()
+    # The remaining checks don't depend on each other (generation only needs
+    # the prepared input), so the slow LLM call overlaps with the rest
+    results.update(run_checks_concurrently({
+        "LLM Generation": (lambda log: test_llm_generation(prepared, log)) if prepared else (lambda log: False),
+        "Output Saving": test_outputs_saved,
+        "Vector DB": test_vector_db,
+        "Sessions": test_conversation_session,
+    }))
     
     # Summary
     print_section("TEST SUMMARY")
-    passed = sum(1 for v in results.values() if v)
+    passed = 0
     total = len(results)
     
+    # Tally while printing rather than scanning the results twice
     for test_name, passed_flag in results.items():
-        status = "✓ PASS" if passed_flag else "✗ FAIL"
-        print(f"  {status:8} {test_name}")
+        if passed_flag:
+            passed += 1
+            print(f"  {PASS_TAG} {test_name}")
+        else:
+            print(f"  {FAIL_TAG} {test_name}")
     
     print(f"\n  Total: {passed}/{total} tests passed")
     
     if passed == total:
         print("\n  ✅ ALL TESTS PASSED! System is working properly.")
-        print("=" * 70)
+        print(RULE)
         sys.exit(0)
     else:
         print("\n  ⚠ SOME TESTS FAILED. See errors above for details.")
-        print("=" * 70)
+        print(RULE)
         sys.exit(1)
 
 if __name__ == "__main__":
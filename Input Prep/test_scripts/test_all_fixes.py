@@ -7,13 +7,17 @@ Test all recent fixes:
 4. Media temporary storage for further processing
 """
 
-import requests
 import json
 import os
 from pathlib import Path
 
+from api_client import create_session, server_is_up
+
 BASE_URL = "http://localhost:8000/api/v1"
 
+# Shared keep-alive session so each call reuses one connection
+session = create_session()
+
 def print_header(title):
     print("\n" + "=" * 70)
     print(f"  {title}")
@@ -32,7 +36,7 @@ def test_file_upload_fix():
             files = {"file": ("sample.txt", f, "text/plain")}
             data = {"user_prompt": "Summarise this file"}
             
-            response = requests.post(f"{BASE_URL}/prepare-text", data=data, files=files)
+            response = session.post(f"{BASE_URL}/prepare-text", data=data, files=files)
             
             if response.status_code == 200:
                 print("   ✓ Valid file upload works")
@@ -47,7 +51,7 @@ def test_file_upload_fix():
     # Test without file (should work)
     print("\n1.2. Testing without file upload...")
     data = {"user_prompt": "Hello without file"}
-    response = requests.post(f"{BASE_URL}/prepare-text", data=data)
+    response = session.post(f"{BASE_URL}/prepare-text", data=data)
     
     if response.status_code == 200:
         print("   ✓ Request without file works")
@@ -62,14 +66,14 @@ def test_conversation_rag_separation():
     
     # Create session
     print("\n2.1. Creating session...")
-    response = requests.post(f"{BASE_URL}/sessions/create")
+    response = session.post(f"{BASE_URL}/sessions/create")
     session_data = response.json()
     session_id = session_data["session_id"]
     print(f"   ✓ Session created: {session_id[:16]}...")
     
     # First message
     print("\n2.2. Sending first message...")
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/prepare-text",
         data={
             "user_prompt": "What is Python?",
@@ -86,7 +90,7 @@ def test_conversation_rag_separation():
     
     # Second message with conversation history
     print("\n2.3. Sending second message (with conversation history)...")
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/prepare-text",
         data={
             "user_prompt": "How do I learn it?",
@@ -125,7 +129,7 @@ def test_vector_db_toggle():
     
     # Test with Vector DB OFF
     print("\n3.1. Testing with Vector DB OFF...")
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/prepare-text",
         data={
             "user_prompt": "What is DSA?",
@@ -140,7 +144,7 @@ def test_vector_db_toggle():
     
     # Test with Vector DB ON
     print("\n3.2. Testing with Vector DB ON...")
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/prepare-text",
         data={
             "user_prompt": "What is DSA?",
@@ -178,7 +182,7 @@ def test_media_storage():
     
     # Test with emoji (no need for actual image file)
     print("\n4.2. Testing with emoji...")
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/prepare-media",
         data={
             "user_prompt": "Hello 😀 world 🌍!"
@@ -190,18 +194,30 @@ def test_media_storage():
         emoji_count = result['image_emoji_stub']['emoji_summary']['count']
         print(f"   ✓ Emoji detected: {emoji_count}")
         
-        # Check if temp_media has new entries
-        if temp_media_dir.exists():
-            subdirs = list(temp_media_dir.iterdir())
-            if len(subdirs) > 0:
-                latest = max(subdirs, key=lambda p: p.stat().st_mtime)
+        # Check if temp_media has new entries: one scandir pass finds the
+        # newest subdirectory using the stat data cached on each DirEntry
+        try:
+            latest, latest_mtime = None, -1.0
+            with os.scandir(temp_media_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        mtime = entry.stat().st_mtime
+                        if mtime > latest_mtime:
+                            latest, latest_mtime = entry, mtime
+        except FileNotFoundError:
+            pass
+        else:
+            if latest is not None:
                 print(f"   ✓ Media saved to: {latest.name}")
                 
                 # Check for metadata file
-                metadata_file = latest / "media_metadata.json"
-                if metadata_file.exists():
+                metadata_file = Path(latest.path) / "media_metadata.json"
+                try:
                     with open(metadata_file) as f:
                         metadata = json.load(f)
+                except FileNotFoundError:
+                    pass
+                else:
                     print(f"   ✓ Metadata file found: {metadata_file.name}")
                     print(f"   ✓ Emoji data stored: {len(metadata.get('emoji_data', []))} emojis")
             else:
@@ -214,6 +230,13 @@ def test_media_storage():
 def main():
     """Run all tests."""
     print_header("COMPREHENSIVE FIX VERIFICATION")
+    
+    # Every test below needs the API and their requests have no timeout, so
+    # check once up front instead of letting each one fail (or hang) in turn
+    if not server_is_up(session, BASE_URL):
+        print(f"\n❌ API not reachable at {BASE_URL}. Start it with: bash start_server.sh")
+        return
+    
     print("\nTesting all recent fixes...")
     
     try:
@@ -4,14 +4,61 @@ Test script for the Input Preparation API.
 Tests all endpoints with various scenarios.
 """
 
+import asyncio
 import requests
 import json
 import time
+from operator import itemgetter
 from pathlib import Path
+from urllib.parse import urlencode
+
+from api_client import create_session
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
 
 BASE_URL = "http://localhost:8000"
 API_PREFIX = "/api/v1"
 
+# Shared keep-alive session: every test (and every timed performance run)
+# reuses the same connection instead of paying a new TCP handshake
+session = create_session()
+
+
+# Requests sent at once in the concurrent phase of test_performance
+CONCURRENT_REQUESTS = 20
+
+
+# Body of the rejected-extension upload in test_error_handling
+INVALID_FILE_BYTES = b"fake executable"
+
+
+# Top-level sections of a PreparedInput response, fetched in one call
+response_sections = itemgetter("text_embed_stub", "image_emoji_stub", "metadata")
+
+
+def to_json(obj) -> str:
+    """Serialize obj to a JSON string, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def parse_json(response: requests.Response):
+    """Parse a response body as JSON, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
 
 def print_section(title):
     """Print a section header."""
@@ -24,12 +71,12 @@ def test_health_check():
     """Test the health check endpoint."""
     print_section("Testing Health Check")
     
-    response = requests.get(f"{BASE_URL}/health")
+    response = session.get(f"{BASE_URL}/health")
     print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    data = parse_json(response)
+    print(f"Response: {json.dumps(data, indent=2)}")
     
     assert response.status_code == 200
-    data = response.json()
     assert "status" in data
     assert "libraries" in data
     print("✓ Health check passed")
@@ -43,20 +90,21 @@ def test_prepare_text_simple():
         "user_prompt": "What is the weather like today? 🌞"
     }
     
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}{API_PREFIX}/prepare-text",
         data=data
     )
     
     print(f"Status: {response.status_code}")
-    result = response.json()
-    print(f"Request ID: {result['metadata']['request_id']}")
-    print(f"Prep time: {result['metadata']['prep_time_ms']:.2f}ms")
-    print(f"Tokens: {result['text_embed_stub']['stats']['token_estimate']}")
-    print(f"Emojis: {result['image_emoji_stub']['emoji_summary']['count']}")
+    result = parse_json(response)
+    text_stub, image_stub, metadata = response_sections(result)
+    print(f"Request ID: {metadata['request_id']}")
+    print(f"Prep time: {metadata['prep_time_ms']:.2f}ms")
+    print(f"Tokens: {text_stub['stats']['token_estimate']}")
+    print(f"Emojis: {image_stub['emoji_summary']['count']}")
     
     assert response.status_code == 200
-    assert result['text_embed_stub']['normalized_user']
+    assert text_stub['normalized_user']
     print("✓ Simple text preparation passed")
 
 
@@ -72,25 +120,26 @@ def test_prepare_text_with_external_data():
     
     data = {
         "user_prompt": "Tell me about today's weather",
-        "external_data": json.dumps(external_data)
+        "external_data": to_json(external_data)
     }
     
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}{API_PREFIX}/prepare-text",
         data=data
     )
     
     print(f"Status: {response.status_code}")
-    result = response.json()
-    print(f"Request ID: {result['metadata']['request_id']}")
-    print(f"External chunks: {len(result['text_embed_stub']['normalized_external'])}")
-    print(f"HMACs: {len(result['text_embed_stub']['hmacs'])}")
-    print(f"RAG enabled: {result['metadata']['rag_enabled']}")
+    result = parse_json(response)
+    text_stub, image_stub, metadata = response_sections(result)
+    print(f"Request ID: {metadata['request_id']}")
+    print(f"External chunks: {len(text_stub['normalized_external'])}")
+    print(f"HMACs: {len(text_stub['hmacs'])}")
+    print(f"RAG enabled: {metadata['rag_enabled']}")
     
     assert response.status_code == 200
-    assert len(result['text_embed_stub']['normalized_external']) == 3
-    assert len(result['text_embed_stub']['hmacs']) == 3
-    assert result['metadata']['rag_enabled'] == True
+    assert len(text_stub['normalized_external']) == 3
+    assert len(text_stub['hmacs']) == 3
+    assert metadata['rag_enabled'] == True
     print("✓ External data preparation passed")
 
 
@@ -118,26 +167,27 @@ The system supports TXT, MD, PDF, and DOCX files."""
             "file": ("test_document.txt", open(test_file, "rb"), "text/plain")
         }
         
-        response = requests.post(
+        response = session.post(
             f"{BASE_URL}{API_PREFIX}/prepare-text",
             data=data,
             files=files
         )
         
         print(f"Status: {response.status_code}")
-        result = response.json()
-        print(f"Request ID: {result['metadata']['request_id']}")
-        print(f"File processed: {result['metadata']['has_file']}")
+        result = parse_json(response)
+        text_stub, image_stub, metadata = response_sections(result)
+        print(f"Request ID: {metadata['request_id']}")
+        print(f"File processed: {metadata['has_file']}")
         
-        if result['metadata']['file_info']:
-            print(f"File hash: {result['metadata']['file_info']['hash'][:16]}...")
-            print(f"Chunks: {result['metadata']['file_info']['chunk_count']}")
-            print(f"Extraction success: {result['metadata']['file_info']['extraction_success']}")
+        if metadata['file_info']:
+            print(f"File hash: {metadata['file_info']['hash'][:16]}...")
+            print(f"Chunks: {metadata['file_info']['chunk_count']}")
+            print(f"Extraction success: {metadata['file_info']['extraction_success']}")
         
-        print(f"External chunks: {len(result['text_embed_stub']['normalized_external'])}")
+        print(f"External chunks: {len(text_stub['normalized_external'])}")
         
         assert response.status_code == 200
-        assert result['metadata']['has_file'] == True
+        assert metadata['has_file'] == True
         print("✓ File upload preparation passed")
         
     finally:
@@ -154,19 +204,20 @@ def test_prepare_media():
         "user_prompt": "Look at these emojis: 😀 🎉 🚀 ❤️"
     }
     
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}{API_PREFIX}/prepare-media",
         data=data
     )
     
     print(f"Status: {response.status_code}")
-    result = response.json()
-    print(f"Request ID: {result['metadata']['request_id']}")
-    print(f"Emojis found: {result['image_emoji_stub']['emoji_summary']['count']}")
-    print(f"Emoji types: {result['image_emoji_stub']['emoji_summary']['types']}")
+    result = parse_json(response)
+    text_stub, image_stub, metadata = response_sections(result)
+    print(f"Request ID: {metadata['request_id']}")
+    print(f"Emojis found: {image_stub['emoji_summary']['count']}")
+    print(f"Emoji types: {image_stub['emoji_summary']['types']}")
     
     assert response.status_code == 200
-    assert result['image_emoji_stub']['emoji_summary']['count'] > 0
+    assert image_stub['emoji_summary']['count'] > 0
     print("✓ Media preparation passed")
 
 
@@ -179,7 +230,7 @@ def test_error_handling():
         "user_prompt": "   "
     }
     
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}{API_PREFIX}/prepare-text",
         data=data
     )
@@ -188,32 +239,36 @@ def test_error_handling():
     assert response.status_code == 400
     print("✓ Empty prompt error handled correctly")
     
-    # Test with invalid file type
-    test_file = Path("test_invalid.exe")
-    test_file.write_bytes(b"fake executable")
+    # Test with invalid file type (sent from memory; no temp file needed)
+    data = {
+        "user_prompt": "Test invalid file"
+    }
     
-    try:
-        data = {
-            "user_prompt": "Test invalid file"
-        }
-        
-        files = {
-            "file": ("test_invalid.exe", open(test_file, "rb"), "application/x-executable")
-        }
-        
-        response = requests.post(
-            f"{BASE_URL}{API_PREFIX}/prepare-text",
-            data=data,
-            files=files
-        )
-        
-        print(f"Invalid file status: {response.status_code}")
-        # Should still process but without file data
-        print("✓ Invalid file handled gracefully")
+    files = {
+        "file": ("test_invalid.exe", INVALID_FILE_BYTES, "application/x-executable")
+    }
+    
+    response = session.post(
+        f"{BASE_URL}{API_PREFIX}/prepare-text",
+        data=data,
+        files=files
+    )
+    
+    print(f"Invalid file status: {response.status_code}")
+    # Should still process but without file data
+    print("✓ Invalid file handled gracefully")
+
+
+async def post_concurrently(url: str, body: str, headers: dict, count: int) -> list:
+    """POST the same body count times at once; return each latency in ms."""
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        async def timed_post():
+            start = time.perf_counter_ns()
+            response = await client.post(url, content=body, headers=headers)
+            response.raise_for_status()
+            return (time.perf_counter_ns() - start) / 1_000_000
         
-    finally:
-        if test_file.exists():
-            test_file.unlink()
+        return await asyncio.gather(*(timed_post() for _ in range(count)))
 
 
 def test_performance():
@@ -224,18 +279,25 @@ def test_performance():
         "user_prompt": "Quick performance test with some text " * 10
     }
     
+    # Encode the form body once so the timed loop only measures the request
+    url = f"{BASE_URL}{API_PREFIX}/prepare-text"
+    body = urlencode(data)
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    
+    # Untimed warmup so the first measured run doesn't include connection
+    # setup or the server's first-request initialization
+    session.post(url, data=body, headers=headers)
+    
     times = []
     for i in range(5):
-        start = time.time()
-        response = requests.post(
-            f"{BASE_URL}{API_PREFIX}/prepare-text",
-            data=data
-        )
-        elapsed = (time.time() - start) * 1000
+        start = time.perf_counter_ns()
+        response = session.post(url, data=body, headers=headers)
+        elapsed = (time.perf_counter_ns() - start) / 1_000_000
         times.append(elapsed)
         
-        result = response.json()
-        prep_time = result['metadata']['prep_time_ms']
+        result = parse_json(response)
+        metadata = result['metadata']
+        prep_time = metadata['prep_time_ms']
         print(f"Run {i+1}: Total={elapsed:.2f}ms, Prep={prep_time:.2f}ms")
     
     avg_time = sum(times) / len(times)
@@ -246,6 +308,28 @@ def test_performance():
         print("✓ Performance within acceptable range")
     else:
         print("⚠ Performance slower than expected")
+    
+    # Throughput under concurrent load (needs httpx for the async client)
+    if HTTPX_AVAILABLE:
+        start = time.perf_counter_ns()
+        latencies = asyncio.run(post_concurrently(url, body, headers, CONCURRENT_REQUESTS))
+        wall_s = (time.perf_counter_ns() - start) / 1_000_000_000
+        print(
+            f"\nConcurrent: {len(latencies)} requests in {wall_s * 1000:.2f}ms "
+            f"({len(latencies) / wall_s:.1f} req/s, max latency {max(latencies):.2f}ms)"
+        )
+
+
+# Test plan, run in order by run_all_tests
+TEST_PLAN = (
+    test_health_check,
+    test_prepare_text_simple,
+    test_prepare_text_with_external_data,
+    test_prepare_text_with_file,
+    test_prepare_media,
+    test_error_handling,
+    test_performance,
+)
 
 
 def run_all_tests():
@@ -257,13 +341,8 @@ def run_all_tests():
     print(f"Make sure the server is running: uvicorn app.main:app --reload")
     
     try:
-        test_health_check()
-        test_prepare_text_simple()
-        test_prepare_text_with_external_data()
-        test_prepare_text_with_file()
-        test_prepare_media()
-        test_error_handling()
-        test_performance()
+        for test in TEST_PLAN:
+            test()
         
         print("\n" + "=" * 60)
         print("  ✓ All tests passed!")
@@ -12,10 +12,16 @@ Demonstrates:
 import requests
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api_client import create_session, server_is_up
 
 # API base URL
 BASE_URL = "http://localhost:8000/api/v1"
 
+# Shared keep-alive session so each call reuses one connection
+session = create_session()
+
 
 def print_section(title):
     """Print a formatted section header."""
@@ -31,14 +37,14 @@ def test_conversation_memory():
     
     # Step 1: Create a new session
     print("\n1. Creating new conversation session...")
-    response = requests.post(f"{BASE_URL}/sessions/create")
+    response = session.post(f"{BASE_URL}/sessions/create")
     session_data = response.json()
     session_id = session_data["session_id"]
     print(f"   ✓ Session created: {session_id[:16]}...")
     
     # Step 2: First question
     print("\n2. Asking first question: 'What is DSA?'")
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/prepare-text",
         data={
             "user_prompt": "What is DSA?",
@@ -51,7 +57,7 @@ def test_conversation_memory():
     print(f"   ✓ Session ID: {prepared['metadata']['session_id'][:16]}...")
     
     # Generate response
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/generate",
         json={
             "prepared_input": prepared,
@@ -66,7 +72,7 @@ def test_conversation_memory():
     
     # Step 3: Follow-up question (tests conversation memory)
     print("\n3. Asking follow-up: 'How do I learn it?' (should remember DSA)")
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/prepare-text",
         data={
             "user_prompt": "How do I learn it in 2 months?",
@@ -87,7 +93,7 @@ def test_conversation_memory():
         print("   ⚠ Conversation history NOT included")
     
     # Generate response
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/generate",
         json={
             "prepared_input": prepared,
@@ -100,14 +106,14 @@ def test_conversation_memory():
     
     # Step 4: Get session info
     print("\n4. Checking session information...")
-    response = requests.get(f"{BASE_URL}/sessions/{session_id}")
+    response = session.get(f"{BASE_URL}/sessions/{session_id}")
     session_info = response.json()
     print(f"   ✓ Messages in session: {session_info['message_count']}")
     print(f"   ✓ Session age: {session_info['inactive_seconds']:.1f}s")
     
     # Step 5: List all sessions
     print("\n5. Listing all active sessions...")
-    response = requests.get(f"{BASE_URL}/sessions")
+    response = session.get(f"{BASE_URL}/sessions")
     sessions_data = response.json()
     print(f"   ✓ Total active sessions: {sessions_data['stats']['total_sessions']}")
     print(f"   ✓ Total messages: {sessions_data['stats']['total_messages']}")
@@ -121,13 +127,13 @@ def test_vector_db_rag():
     print_section("TEST 2: RAG (VECTOR DATABASE) RETRIEVAL")
     
     # Create new session for RAG test
-    response = requests.post(f"{BASE_URL}/sessions/create")
+    response = session.post(f"{BASE_URL}/sessions/create")
     session_id = response.json()["session_id"]
     print(f"\n1. Created session: {session_id[:16]}...")
     
     # Test query that should retrieve from vector DB
     print("\n2. Asking: 'What is the capital of France?' (with RAG enabled)")
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/prepare-text",
         data={
             "user_prompt": "What is the capital of France?",
@@ -155,7 +161,7 @@ def test_vector_db_rag():
         print("      Did you run: python populate_vector_db.py ?")
     
     # Generate response with RAG context
-    response = requests.post(
+    response = session.post(
         f"{BASE_URL}/generate",
         json={
             "prepared_input": prepared,
@@ -176,21 +182,21 @@ def test_session_management(session_id):
     
     # Clear session
     print("\n1. Clearing session messages...")
-    response = requests.post(f"{BASE_URL}/sessions/{session_id}/clear")
+    response = session.post(f"{BASE_URL}/sessions/{session_id}/clear")
     print(f"   ✓ {response.json()['message']}")
     
     # Verify cleared
-    response = requests.get(f"{BASE_URL}/sessions/{session_id}")
+    response = session.get(f"{BASE_URL}/sessions/{session_id}")
     session_info = response.json()
     print(f"   ✓ Messages after clear: {session_info['message_count']}")
     
     # Delete session
     print("\n2. Deleting session...")
-    response = requests.delete(f"{BASE_URL}/sessions/{session_id}")
+    response = session.delete(f"{BASE_URL}/sessions/{session_id}")
     print(f"   ✓ {response.json()['message']}")
     
     # Verify deleted
-    response = requests.get(f"{BASE_URL}/sessions/{session_id}")
+    response = session.get(f"{BASE_URL}/sessions/{session_id}")
     if response.status_code == 404:
         print(f"   ✓ Session successfully deleted (404 returned)")
 
@@ -209,7 +215,18 @@ def main():
     print("  2. Vector DB populated: python populate_vector_db.py")
     print("  3. ChromaDB installed: pip install chromadb")
     
-    input("\nPress Enter to start tests...")
+    # Probe the server in the background while waiting for the user, so the
+    # pre-flight check costs nothing on top of the prompt
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        server_probe = executor.submit(server_is_up, session, BASE_URL)
+        input("\nPress Enter to start tests...")
+        server_up = server_probe.result()
+    
+    if not server_up:
+        print("\n❌ Error: Could not connect to server!")
+        print("   Make sure the server is running:")
+        print("   uvicorn app.main:app --reload")
+        return
     
     try:
         # Test 1: Conversation Memory
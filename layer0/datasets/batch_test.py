@@ -7,6 +7,7 @@ Tests the Layer0 server against the unified attack dataset and reports detection
 import json
 import time
 import httpx
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from collections import defaultdict
 
@@ -14,6 +15,17 @@ from collections import defaultdict
 LAYER0_URL = "http://localhost:3001/layer0"
 DATASET_FILE = Path(__file__).parent / "unified_attacks.jsonl"
 RESULTS_FILE = Path(__file__).parent / "test_results.json"
+REQUEST_TIMEOUT = 10.0
+# Requests in flight at once; matches the client's connection pool
+BATCH_WORKERS = 16
+
+
+def make_client() -> httpx.Client:
+    """Create the keep-alive client shared by every request of a run."""
+    return httpx.Client(
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(max_connections=BATCH_WORKERS, max_keepalive_connections=BATCH_WORKERS),
+    )
 
 
 def load_dataset() -> list[dict]:
@@ -38,7 +50,7 @@ def test_single(client: httpx.Client, text: str) -> dict:
     }
     
     try:
-        response = client.post(LAYER0_URL, json=payload, timeout=10.0)
+        response = client.post(LAYER0_URL, json=payload)
         return response.json()
     except Exception as e:
         return {"error": str(e)}
@@ -76,8 +88,11 @@ def main():
     print("\n🔄 Testing against Layer0...")
     start_time = time.time()
     
-    with httpx.Client() as client:
-        for i, record in enumerate(records):
+    # Requests run concurrently on the shared client; map() yields responses
+    # in dataset order, so tallies and samples match a sequential run
+    with make_client() as client, ThreadPoolExecutor(max_workers=BATCH_WORKERS) as executor:
+        responses = executor.map(lambda record: test_single(client, record["text"]), records)
+        for i, (record, response) in enumerate(zip(records, responses)):
             if (i + 1) % 100 == 0:
                 print(f"   Progress: {i+1}/{len(records)}")
             
@@ -85,8 +100,6 @@ def main():
             category = record["category"]
             rec_type = record["type"]
             
-            response = test_single(client, text)
-            
             if "error" in response:
                 results["errors"] += 1
                 continue
@@ -22,6 +22,7 @@ Run with:
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import hmac
 import json
@@ -29,11 +30,15 @@ import logging
 import os
 import re
 import sqlite3
+import threading
 import unicodedata
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any, AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Iterable, NamedTuple, Optional
 
 import httpx
 from fastapi import FastAPI, HTTPException, Request, Depends
@@ -53,6 +58,8 @@ STORE_RAW = os.getenv("STORE_RAW", "false").lower() == "true"
 HMAC_SECRET = os.getenv("HMAC_SECRET", "layer0-secret-key").encode()
 DB_PATH = Path(os.getenv("DB_PATH", str(BASE_DIR / "data" / "layer0_logs.db")))
 RULES_DIR = Path(os.getenv("RULES_DIR", str(BASE_DIR / "rules")))
+SCAN_CACHE_SIZE = int(os.getenv("SCAN_CACHE_SIZE", "1024"))
+SCAN_OFFLOAD_MIN_CHARS = int(os.getenv("SCAN_OFFLOAD_MIN_CHARS", "20000"))
 
 # Logging setup
 logging.basicConfig(
@@ -61,6 +68,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger("layer0")
 
+# Optional faster JSON parser for request bodies
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.info("orjson not available. Request bodies are parsed with json.")
+
 # ============================================================================
 # Precompiled Regex Patterns
 # ============================================================================
@@ -75,6 +90,10 @@ SANITIZE_PATTERNS: list[re.Pattern] = [
     re.compile(r"https?://[^\s\]]+"),  # URLs
 ]
 
+# Zero-width characters stripped during sanitization (deletion table for str.translate)
+ZERO_WIDTH_TABLE = str.maketrans("", "", "\u200B\u200C\u200D\u2060\uFEFF")
+WHITESPACE_RE = re.compile(r"\s+")
+
 # BLOCK patterns - immediate rejection
 BLOCK_PATTERNS: dict[str, re.Pattern] = {
     "ignore_previous": re.compile(r"(?i)ignore\s+previous\s+instructions"),
@@ -178,7 +197,7 @@ def init_db() -> None:
     """)
     conn.commit()
     conn.close()
-    logger.info(f"Database initialized at {DB_PATH}")
+    logger.info("Database initialized at %s", DB_PATH)
 
 
 def log_event(
@@ -199,7 +218,7 @@ def log_event(
         stored_raw_text = None
         
         if raw_text:
-            raw_text_hmac = hmac.new(HMAC_SECRET, raw_text.encode(), hashlib.sha256).hexdigest()
+            raw_text_hmac = hmac.digest(HMAC_SECRET, raw_text.encode(), "sha256").hex()
             if STORE_RAW:
                 stored_raw_text = raw_text
         
@@ -221,100 +240,286 @@ def log_event(
         conn.commit()
         conn.close()
     except Exception as e:
-        logger.error(f"Failed to log event: {e}")
+        logger.error("Failed to log event: %s", e)
 
 
 # ============================================================================
 # Dynamic Rules Loading
 # ============================================================================
 
+@lru_cache(maxsize=1024)
+def compile_rule_pattern(pattern: str, flags: int = 0) -> re.Pattern:
+    """
+    Compile a rule pattern, memoized across reloads.
+    
+    Rule files are reloaded via /admin/reload-rules, and most of their
+    patterns are unchanged between reloads. Keeping our own cache means
+    they are not recompiled once they age out of re's small shared cache.
+    """
+    return re.compile(pattern, flags)
+
+
+# Leading global inline flags, e.g. "(?i)"; they are re-applied as scoped flags
+INLINE_FLAGS_RE = re.compile(r"^\(\?[aiLmsux]+\)")
+BACKREFERENCE_RE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def is_fusable(pattern: re.Pattern) -> bool:
+    """Whether a rule pattern can be fused into a prefilter union."""
+    return isinstance(pattern.pattern, str) and BACKREFERENCE_RE.search(pattern.pattern) is None
+
+
+def build_prefilter(patterns: Iterable[re.Pattern]) -> Optional[re.Pattern]:
+    """
+    Fuse rule patterns into one alternation used to skip clean text.
+    
+    Text that does not match the union cannot match any single rule, so
+    the per-rule loop only runs for text that hits at least one of them.
+    
+    Args:
+        patterns: Compiled rule patterns
+    
+    Returns:
+        Compiled union pattern, or None if the rules cannot be fused
+        (back-references, conflicting group names).
+    """
+    alternatives = []
+    for pattern in patterns:
+        if not is_fusable(pattern):
+            return None
+        
+        source = pattern.pattern
+        scoped = "".join(
+            letter for flag, letter in (
+                (re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.VERBOSE, "x")
+            ) if pattern.flags & flag
+        )
+        source = INLINE_FLAGS_RE.sub("", source, count=1)
+        alternatives.append(f"(?{scoped}:{source})" if scoped else f"(?:{source})")
+    
+    if not alternatives:
+        return None
+    
+    union = "|".join(alternatives)
+    try:
+        return re.compile(union)
+    except re.error as e:
+        logger.warning("Could not build rule prefilter: %s", e)
+        return None
+
+
+class RuleTables(NamedTuple):
+    """
+    Block or flag rules prepared for matching.
+    
+    Rebuilt on reload and swapped in with a single assignment, so a scan
+    running in a worker thread never sees the union of one rule set with
+    the rule list of another.
+    """
+    # Union of the fusable rules; None if nothing could be fused
+    prefilter: Optional[re.Pattern]
+    # Every (rule_id, pattern) in rule-file order; for flag rules the id is
+    # the preformatted "flag:<id>" signature
+    rules: tuple[tuple[str, re.Pattern], ...]
+    # Rules left out of the union (back-references), checked one by one
+    # after a prefilter miss
+    unfused: tuple[tuple[str, re.Pattern], ...]
+
+
 class RulesManager:
     """Manages dynamic rule loading from JSONL files."""
     
     def __init__(self) -> None:
-        self.block_rules: dict[str, re.Pattern] = {}
-        self.flag_rules: dict[str, re.Pattern] = {}
+        # Built-in patterns merged with custom rules (custom ids override);
+        # seeded with the built-ins so checks work before the first load
+        self.block_rules: dict[str, re.Pattern] = dict(BLOCK_PATTERNS)
+        self.flag_rules: dict[str, re.Pattern] = dict(FLAG_PATTERNS)
+        self.block_tables = RuleTables(None, (), ())
+        self.flag_tables = RuleTables(None, (), ())
         self.loaded_at: Optional[datetime] = None
+        # Parsed rules per file, keyed by (st_mtime_ns, st_size) of the file
+        # when it was parsed; unchanged files are not re-read on reload
+        self._file_cache: dict[Path, tuple[tuple[int, int], list[tuple[str, str, re.Pattern]]]] = {}
+        self._build_prefilters()
     
     def load_rules(self) -> int:
         """Load rules from JSONL files in rules directory."""
-        self.block_rules = dict(BLOCK_PATTERNS)  # Start with built-in
-        self.flag_rules = dict(FLAG_PATTERNS)    # Start with built-in
+        block_rules = dict(BLOCK_PATTERNS)  # Start with built-in
+        flag_rules = dict(FLAG_PATTERNS)    # Start with built-in
         
         loaded_count = 0
         
         if not RULES_DIR.exists():
             RULES_DIR.mkdir(parents=True, exist_ok=True)
-            logger.warning(f"Created rules directory: {RULES_DIR}")
-            return loaded_count
+            logger.warning("Created rules directory: %s", RULES_DIR)
         
+        file_cache: dict[Path, tuple[tuple[int, int], list[tuple[str, str, re.Pattern]]]] = {}
         for rule_file in RULES_DIR.glob("*.jsonl"):
             try:
-                with open(rule_file, "r", encoding="utf-8") as f:
-                    for line_num, line in enumerate(f, 1):
-                        line = line.strip()
-                        if not line or line.startswith("#"):
-                            continue
-                        try:
-                            rule = json.loads(line)
-                            rule_id = rule.get("id", f"{rule_file.stem}_{line_num}")
-                            pattern = rule.get("pattern", "")
-                            rule_type = rule.get("type", "flag")
-                            flags = re.IGNORECASE if rule.get("ignore_case", True) else 0
-                            
-                            compiled = re.compile(pattern, flags)
-                            
-                            if rule_type == "block":
-                                self.block_rules[rule_id] = compiled
-                            else:
-                                self.flag_rules[rule_id] = compiled
-                            
-                            loaded_count += 1
-                        except (json.JSONDecodeError, re.error) as e:
-                            logger.warning(f"Invalid rule in {rule_file}:{line_num}: {e}")
+                stat = rule_file.stat()
+                version = (stat.st_mtime_ns, stat.st_size)
+                cached = self._file_cache.get(rule_file)
+                if cached is not None and cached[0] == version:
+                    rules = cached[1]
+                else:
+                    rules = self._parse_rule_file(rule_file)
+                file_cache[rule_file] = (version, rules)
             except Exception as e:
-                logger.error(f"Failed to load {rule_file}: {e}")
+                logger.error("Failed to load %s: %s", rule_file, e)
+                continue
+            
+            for rule_id, rule_type, compiled in rules:
+                if rule_type == "block":
+                    block_rules[rule_id] = compiled
+                else:
+                    flag_rules[rule_id] = compiled
+                loaded_count += 1
+        
+        # Only invalidate derived state when some rule file actually changed
+        unchanged = (
+            self.loaded_at is not None
+            and file_cache == self._file_cache
+        )
+        self._file_cache = file_cache
+        self.block_rules = block_rules
+        self.flag_rules = flag_rules
+        
+        if not unchanged:
+            self._build_prefilters()
+            clear_scan_cache()
         
         self.loaded_at = datetime.now(timezone.utc)
-        logger.info(f"Loaded {loaded_count} custom rules from {RULES_DIR}")
+        logger.info("Loaded %s custom rules from %s", loaded_count, RULES_DIR)
         return loaded_count
+    
+    @staticmethod
+    def _parse_rule_file(rule_file: Path) -> list[tuple[str, str, re.Pattern]]:
+        """
+        Parse one JSONL rule file.
+        
+        Args:
+            rule_file: Path to the .jsonl file
+        
+        Returns:
+            List of (rule_id, rule_type, compiled pattern); invalid lines are
+            logged and skipped
+        """
+        rules = []
+        with open(rule_file, "r", encoding="utf-8") as f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    rule = json.loads(line)
+                    rule_id = rule.get("id", f"{rule_file.stem}_{line_num}")
+                    pattern = rule.get("pattern", "")
+                    rule_type = rule.get("type", "flag")
+                    flags = re.IGNORECASE if rule.get("ignore_case", True) else 0
+                    
+                    rules.append((rule_id, rule_type, compile_rule_pattern(pattern, flags)))
+                except (json.JSONDecodeError, re.error) as e:
+                    logger.warning("Invalid rule in %s:%s: %s", rule_file, line_num, e)
+        return rules
+    
+    def _build_prefilters(self) -> None:
+        """Rebuild the block and flag rule tables from the current rules."""
+        block_rules = tuple(self.block_rules.items())
+        self.block_tables = RuleTables(
+            prefilter=build_prefilter(p for _, p in block_rules if is_fusable(p)),
+            rules=block_rules,
+            unfused=tuple((rule_id, p) for rule_id, p in block_rules if not is_fusable(p)),
+        )
+        
+        # Signatures are formatted once here, not on every check
+        flag_rules = tuple((f"flag:{rule_id}", p) for rule_id, p in self.flag_rules.items())
+        self.flag_tables = RuleTables(
+            prefilter=build_prefilter(p for _, p in flag_rules if is_fusable(p)),
+            rules=flag_rules,
+            unfused=tuple((signature, p) for signature, p in flag_rules if not is_fusable(p)),
+        )
 
 
 # Global rules manager
 rules_manager = RulesManager()
 
 
+# ============================================================================
+# Layer 1 HTTP Client
+# ============================================================================
+
+# Shared client so connection pool and TLS state are reused across requests
+_layer1_client: Optional[httpx.AsyncClient] = None
+
+
+def get_layer1_client() -> httpx.AsyncClient:
+    """Get or create the shared Layer 1 HTTP client."""
+    global _layer1_client
+    if _layer1_client is None or _layer1_client.is_closed:
+        _layer1_client = httpx.AsyncClient(timeout=30.0)
+    return _layer1_client
+
+
+async def close_layer1_client() -> None:
+    """Close the shared Layer 1 HTTP client if it was created."""
+    global _layer1_client
+    if _layer1_client is not None:
+        await _layer1_client.aclose()
+        _layer1_client = None
+
+
 # ============================================================================
 # Text Processing Functions
 # ============================================================================
 
+# Only texts up to this length are memoized, to bound the cache's memory
+SANITIZE_CACHE_MAX_CHARS = 10000
+
+
 def sanitize_text(text: str) -> str:
     """
     Remove markers, URLs, and normalize text.
     
     Strips: [EXTERNAL], [/EXTERNAL], [CONVERSATION], [/CONVERSATION],
             [Source: ...], URLs, and normalizes unicode.
+    
+    Results for short texts are memoized; clients resend the same prompts
+    and RAG chunks, and sanitizing is a pure function of the text.
     """
     if not text:
         return ""
     
+    if len(text) <= SANITIZE_CACHE_MAX_CHARS:
+        return _sanitize_text_cached(text)
+    return _sanitize_text(text)
+
+
+def _sanitize_text(text: str) -> str:
+    """Uncached body of sanitize_text."""
     # Apply all sanitization patterns
     result = text
     for pattern in SANITIZE_PATTERNS:
         result = pattern.sub("", result)
     
-    # Unicode NFKC normalization
-    result = unicodedata.normalize("NFKC", result)
-    
-    # Remove zero-width characters
-    result = re.sub(r"[\u200B\u200C\u200D\u2060\uFEFF]", "", result)
+    # NFKC and zero-width removal leave ASCII untouched; most prompts are
+    # ASCII, so they skip both passes
+    if not result.isascii():
+        # Remove zero-width characters first, so NFKC sees (and composes)
+        # the characters they were splitting
+        result = result.translate(ZERO_WIDTH_TABLE)
+        
+        # Unicode NFKC normalization
+        result = unicodedata.normalize("NFKC", result)
     
     # Normalize whitespace
-    result = re.sub(r"\s+", " ", result).strip()
+    result = WHITESPACE_RE.sub(" ", result).strip()
     
     return result
 
 
+_sanitize_text_cached = lru_cache(maxsize=1024)(_sanitize_text)
+
+
 def extract_text_channels(payload: dict[str, Any]) -> tuple[str, str, str]:
     """
     Extract text channels from Input-Prep JSON.
@@ -373,12 +578,21 @@ def check_block_patterns(text: str) -> Optional[tuple[str, str]]:
     """
     Check text against BLOCK patterns.
     
+    Clean text is rejected by a single search of the fused prefilter. On
+    a hit, rules are tried in rule-file order so the first matching rule
+    is the one reported.
+    
     Returns:
         Optional tuple of (rule_id, matched_text) if blocked, else None.
     """
-    all_block_rules = {**BLOCK_PATTERNS, **rules_manager.block_rules}
+    tables = rules_manager.block_tables
+    if tables.prefilter is not None and tables.prefilter.search(text) is None:
+        # No fused rule matches; only the back-reference rules remain
+        rules = tables.unfused
+    else:
+        rules = tables.rules
     
-    for rule_id, pattern in all_block_rules.items():
+    for rule_id, pattern in rules:
         match = pattern.search(text)
         if match:
             return (rule_id, match.group(0))
@@ -393,14 +607,14 @@ def check_flag_patterns(text: str) -> list[str]:
     Returns:
         List of matched rule IDs.
     """
-    all_flag_rules = {**FLAG_PATTERNS, **rules_manager.flag_rules}
-    matched = []
-    
-    for rule_id, pattern in all_flag_rules.items():
-        if pattern.search(text):
-            matched.append(f"flag:{rule_id}")
+    tables = rules_manager.flag_tables
+    if tables.prefilter is not None and tables.prefilter.search(text) is None:
+        # No fused rule matches; only the back-reference rules remain
+        rules = tables.unfused
+    else:
+        rules = tables.rules
     
-    return matched
+    return [signature for signature, pattern in rules if pattern.search(text) is not None]
 
 
 def detect_code(text: str) -> CodeDetectionResult:
@@ -412,8 +626,10 @@ def detect_code(text: str) -> CodeDetectionResult:
     Returns:
         CodeDetectionResult with is_code, detected_language, confidence, and snippets.
     """
+    # Results are built from values computed here, so skip pydantic
+    # validation (model_construct) on this per-channel path
     if not text:
-        return CodeDetectionResult(is_code=False)
+        return CodeDetectionResult.model_construct(is_code=False)
     
     code_snippets: list[str] = []
     language_scores: dict[str, float] = {}
@@ -445,13 +661,13 @@ def detect_code(text: str) -> CodeDetectionResult:
             match_score = len(set(matches)) * 0.2
             language_scores[lang] = language_scores.get(lang, 0) + match_score
     
-    # Apply heuristics
-    semicolon_matches = HEURISTIC_PATTERNS["semicolon_heavy"].findall(text)
-    brace_matches = HEURISTIC_PATTERNS["brace_heavy"].findall(text)
+    # Apply heuristics (count only up to each threshold; no match lists)
+    semicolon_count = sum(1 for _ in islice(HEURISTIC_PATTERNS["semicolon_heavy"].finditer(text), 3))
+    brace_count = sum(1 for _ in islice(HEURISTIC_PATTERNS["brace_heavy"].finditer(text), 2))
     
-    if len(semicolon_matches) >= 3:
+    if semicolon_count >= 3:
         heur_score += 0.1
-    if len(brace_matches) >= 2:
+    if brace_count >= 2:
         heur_score += 0.1
     
     # Determine best language
@@ -468,7 +684,7 @@ def detect_code(text: str) -> CodeDetectionResult:
     # Determine if code is present
     is_code = confidence >= 0.35 or len(code_snippets) > 0
     
-    return CodeDetectionResult(
+    return CodeDetectionResult.model_construct(
         is_code=is_code,
         detected_language=detected_language if is_code else None,
         confidence=round(confidence, 3),
@@ -476,6 +692,101 @@ def detect_code(text: str) -> CodeDetectionResult:
     )
 
 
+# ============================================================================
+# Scan Cache
+# ============================================================================
+
+class ChannelScan(NamedTuple):
+    """Rule and code detection results for one sanitized text channel."""
+    block: Optional[tuple[str, str]]
+    flags: tuple[str, ...] = ()
+    code: Optional[CodeDetectionResult] = None
+
+
+# LRU of ChannelScan keyed by SHA-256 of the sanitized text; cleared on rule reload.
+# Large texts are scanned in worker threads, hence the lock.
+_scan_cache: OrderedDict[bytes, ChannelScan] = OrderedDict()
+_scan_cache_lock = threading.Lock()
+
+
+def clear_scan_cache() -> None:
+    """Drop all cached scan results (rules changed)."""
+    with _scan_cache_lock:
+        _scan_cache.clear()
+
+
+def scan_channel(text: str) -> ChannelScan:
+    """
+    Run block, flag and code checks on a text channel, memoized by content.
+    
+    Clients retry and replay identical prompts, so repeated texts reuse the
+    previous result instead of re-running every pattern. Flag and code
+    checks are skipped for blocked text, as the request stops there.
+    
+    Args:
+        text: Sanitized channel text
+    
+    Returns:
+        ChannelScan with the block match, flag signatures and code result
+    """
+    key = hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest()
+    with _scan_cache_lock:
+        cached = _scan_cache.get(key)
+        if cached is not None:
+            _scan_cache.move_to_end(key)
+            return cached
+    
+    block_result = check_block_patterns(text)
+    if block_result:
+        result = ChannelScan(block=block_result)
+    else:
+        result = ChannelScan(
+            block=None,
+            flags=tuple(check_flag_patterns(text)),
+            code=detect_code(text)
+        )
+    
+    with _scan_cache_lock:
+        _scan_cache[key] = result
+        if len(_scan_cache) > SCAN_CACHE_SIZE:
+            _scan_cache.popitem(last=False)
+    
+    return result
+
+
+# Offloaded scans currently running, keyed by text. Event-loop only, no lock.
+_inflight_scans: dict[str, asyncio.Future] = {}
+
+
+async def scan_channel_async(text: str) -> ChannelScan:
+    """
+    Run scan_channel without stalling the event loop on large texts.
+    
+    Short texts (the common case) are scanned inline; texts of at least
+    SCAN_OFFLOAD_MIN_CHARS run in a worker thread, so one huge RAG payload
+    does not hold up every other in-flight request. Concurrent requests
+    carrying the same large text share one worker-thread scan, since the
+    scan cache is only filled once that scan finishes.
+    
+    Args:
+        text: Sanitized channel text
+    
+    Returns:
+        ChannelScan for the text
+    """
+    if len(text) < SCAN_OFFLOAD_MIN_CHARS:
+        return scan_channel(text)
+    
+    pending = _inflight_scans.get(text)
+    if pending is None:
+        pending = asyncio.ensure_future(asyncio.to_thread(scan_channel, text))
+        _inflight_scans[text] = pending
+        pending.add_done_callback(lambda _: _inflight_scans.pop(text, None))
+    
+    # A disconnecting client must not cancel the scan other requests await
+    return await asyncio.shield(pending)
+
+
 def calculate_severity(
     threat_signatures: list[str],
     code_result: CodeDetectionResult,
@@ -488,27 +799,21 @@ def calculate_severity(
     1: Low-medium risk (code detected, some flags)
     2: High risk (multiple suspicious patterns)
     """
-    severity = 0
-    
-    # Code detection adds severity
-    if code_result.is_code:
-        severity = max(severity, 1)
-    
-    # Threat signatures
+    # Severity 2 is the ceiling, so return as soon as either signal reaches it
     sig_count = len(threat_signatures)
     if sig_count >= 3:
-        severity = max(severity, 2)
-    elif sig_count >= 1:
-        severity = max(severity, 1)
+        return 2
     
     # Heuristic flags from input
     suspicious_score = heuristic_flags.get("suspicious_score", 0)
     if suspicious_score >= 0.5:
-        severity = max(severity, 2)
-    elif suspicious_score >= 0.3:
-        severity = max(severity, 1)
+        return 2
+    
+    # Code detection, threat signatures and moderate heuristics add severity 1
+    if code_result.is_code or sig_count >= 1 or suspicious_score >= 0.3:
+        return 1
     
-    return severity
+    return 0
 
 
 # ============================================================================
@@ -523,7 +828,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     rules_manager.load_rules()
     logger.info("Layer0 service started on port 3001")
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    await close_layer1_client()
     logger.info("Layer0 service stopping")
 
 
@@ -561,16 +867,19 @@ async def process_layer0(request: Request) -> dict[str, Any]:
     Accepts Input-Prep JSON, validates, sanitizes, and forwards to Layer 1.
     """
     try:
-        payload = await request.json()
+        if ORJSON_AVAILABLE:
+            payload = orjson.loads(await request.body())
+        else:
+            payload = await request.json()
     except Exception as e:
-        logger.error(f"Invalid JSON payload: {e}")
+        logger.error("Invalid JSON payload: %s", e)
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
     
     # Extract metadata
     meta = extract_metadata(payload)
     request_id = meta["request_id"]
     
-    logger.info(f"Processing request: {request_id}")
+    logger.info("Processing request: %s", request_id)
     
     # Extract and sanitize text channels
     clean_user, clean_external, fallback_merged = extract_text_channels(payload)
@@ -581,14 +890,16 @@ async def process_layer0(request: Request) -> dict[str, Any]:
     
     # ========== BLOCK CHECK ==========
     # Check user channel
-    block_result = check_block_patterns(clean_user)
+    user_scan = await scan_channel_async(clean_user)
+    block_result = user_scan.block
     if not block_result:
         # Check external channel
-        block_result = check_block_patterns(clean_external)
+        external_scan = await scan_channel_async(clean_external)
+        block_result = external_scan.block
     
     if block_result:
         rule_id, matched_text = block_result
-        logger.warning(f"BLOCKED request {request_id}: rule={rule_id}")
+        logger.warning("BLOCKED request %s: rule=%s", request_id, rule_id)
         
         log_event(
             request_id=request_id,
@@ -607,14 +918,13 @@ async def process_layer0(request: Request) -> dict[str, Any]:
         }
     
     # ========== FLAG CHECK ==========
-    threat_signatures = []
-    threat_signatures.extend(check_flag_patterns(clean_user))
-    threat_signatures.extend(check_flag_patterns(clean_external))
-    threat_signatures = list(set(threat_signatures))  # Deduplicate
+    # Both channels' signatures in one pass, deduplicated in first-seen order
+    # (a set scrambled the order between otherwise identical requests)
+    threat_signatures = list(dict.fromkeys(user_scan.flags + external_scan.flags))
     
     # ========== CODE DETECTION ==========
-    code_result_user = detect_code(clean_user)
-    code_result_external = detect_code(clean_external)
+    code_result_user = user_scan.code
+    code_result_external = external_scan.code
     
     # Combine code detection results
     is_code = code_result_user.is_code or code_result_external.is_code
@@ -626,11 +936,15 @@ async def process_layer0(request: Request) -> dict[str, Any]:
     # ========== SEVERITY CALCULATION ==========
     severity = calculate_severity(
         threat_signatures,
-        CodeDetectionResult(is_code=is_code, detected_language=detected_language, confidence=confidence_code),
+        CodeDetectionResult.model_construct(
+            is_code=is_code, detected_language=detected_language, confidence=confidence_code
+        ),
         meta["heuristic_flags"]
     )
     
     # ========== BUILD LAYER1 PAYLOAD ==========
+    # Validated normally: request_id, emoji_descriptions and heuristic_flags
+    # come straight from the client payload
     layer1_payload = Layer1Payload(
         clean_user=clean_user,
         clean_external=clean_external,
@@ -652,24 +966,26 @@ async def process_layer0(request: Request) -> dict[str, Any]:
     layer1_response = None
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                LAYER1_URL,
-                json=layer1_payload.model_dump(),
-                headers={"Content-Type": "application/json"}
-            )
+        client = get_layer1_client()
+        # Serialized by pydantic-core straight to JSON, skipping the
+        # intermediate dict and json.dumps
+        response = await client.post(
+            LAYER1_URL,
+            content=layer1_payload.model_dump_json(),
+            headers={"Content-Type": "application/json"}
+        )
+        
+        if response.status_code == 200:
+            layer1_response = response.json()
+            forwarded = True
+            logger.info("Forwarded request %s to Layer 1", request_id)
+        else:
+            logger.warning("Layer 1 returned %s for %s", response.status_code, request_id)
             
-            if response.status_code == 200:
-                layer1_response = response.json()
-                forwarded = True
-                logger.info(f"Forwarded request {request_id} to Layer 1")
-            else:
-                logger.warning(f"Layer 1 returned {response.status_code} for {request_id}")
-                
     except httpx.ConnectError:
-        logger.warning(f"Layer 1 unreachable for request {request_id}")
+        logger.warning("Layer 1 unreachable for request %s", request_id)
     except Exception as e:
-        logger.error(f"Error forwarding to Layer 1: {e}")
+        logger.error("Error forwarding to Layer 1: %s", e)
     
     # ========== LOG EVENT ==========
     log_event(
@@ -737,7 +1053,7 @@ async def reload_rules(
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler."""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     return {
         "error": "Internal server error",
         "detail": str(exc) if os.getenv("DEBUG") else "An error occurred",
@@ -945,6 +1261,10 @@ if __name__ == "__main__":
     parser.add_argument("--test", type=str, help="Test locally with a JSON file (no server)")
     parser.add_argument("--text", type=str, help="Test with direct text input")
     parser.add_argument("--port", type=int, default=3001, help="Port to run server on")
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+        help="Server processes; rule scanning is CPU-bound, so use one per core (default: $WEB_CONCURRENCY or 1)"
+    )
     
     args = parser.parse_args()
     
@@ -954,4 +1274,8 @@ if __name__ == "__main__":
         test_local(args.test)
     else:
         import uvicorn
-        uvicorn.run(app, host="0.0.0.0", port=args.port)
+        if args.workers > 1:
+            # Worker processes import the app themselves, so pass it by name
+            uvicorn.run("server:app", app_dir=str(BASE_DIR), host="0.0.0.0", port=args.port, workers=args.workers)
+        else:
+            uvicorn.run(app, host="0.0.0.0", port=args.port)
@@ -0,0 +1,46 @@
+"""
+Shared fixtures for Layer0 tests.
+"""
+
+import httpx
+import pytest
+import pytest_asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import server
+
+
+@pytest.fixture(scope="session")
+def loaded_rules() -> server.RulesManager:
+    """
+    A RulesManager loaded from the repo's rules directory, built once.
+    
+    Parsing the rule files and fusing the prefilters is the expensive part
+    of a manager; tests that only match against the loaded rules share it.
+    """
+    manager = server.RulesManager()
+    manager.load_rules()
+    return manager
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client(tmp_path_factory):
+    """
+    Start the Layer0 app once for the whole test session.
+    
+    Logging goes to a temp DB and Layer 1 points at a closed port. The app
+    lifespan (DB init, rule loading, Layer 1 client shutdown) runs once, and
+    every endpoint test shares the same event loop and client.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(server, "DB_PATH", tmp_path_factory.mktemp("layer0") / "layer0_logs.db")
+        mp.setattr(server, "LAYER1_URL", "http://127.0.0.1:9/layer1")
+        
+        transport = httpx.ASGITransport(app=server.app)
+        async with server.lifespan(server.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+                yield ac
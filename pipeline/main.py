@@ -29,6 +29,22 @@ from contracts.manifest import (
 
 logger = logging.getLogger(__name__)
 
+# Optional uvloop: libuv-based event loop for the synchronous entry points.
+# Under uvicorn the server already picks uvloop itself (loop="auto").
+# uvloop.run only exists from uvloop 0.18; older releases use asyncio.run.
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = hasattr(uvloop, "run")
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+
+def _run_coroutine(coro):
+    """Run a coroutine to completion on a fresh event loop (uvloop if available)."""
+    if UVLOOP_AVAILABLE:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
 
 class Pipeline:
     """
@@ -69,6 +85,9 @@ class Pipeline:
         self._layer0_runner: Optional[Callable] = None
         self._input_prep_runner: Optional[Callable] = None
         self._image_proc_runner: Optional[Callable] = None
+        # Layers whose import was already attempted; a failed import is not
+        # cached by Python, so without this every request would retry it
+        self._resolved_layers: set[str] = set()
         
         logger.info(
             f"Pipeline initialized: layer0={enable_layer0}, "
@@ -77,7 +96,8 @@ class Pipeline:
     
     def _get_layer0_runner(self):
         """Lazy-load Layer 0 runner."""
-        if self._layer0_runner is None:
+        if self._layer0_runner is None and "layer0" not in self._resolved_layers:
+            self._resolved_layers.add("layer0")
             try:
                 from layer0.scanner import scanner
                 self._layer0_runner = scanner
@@ -89,7 +109,8 @@ class Pipeline:
     
     def _get_input_prep_runner(self):
         """Lazy-load Input Prep runner."""
-        if self._input_prep_runner is None:
+        if self._input_prep_runner is None and "input_prep" not in self._resolved_layers:
+            self._resolved_layers.add("input_prep")
             try:
                 from input_prep.runner import run as input_prep_run
                 self._input_prep_runner = input_prep_run
@@ -107,7 +128,8 @@ class Pipeline:
     
     def _get_image_proc_runner(self):
         """Lazy-load Image Processing runner."""
-        if self._image_proc_runner is None:
+        if self._image_proc_runner is None and "image_proc" not in self._resolved_layers:
+            self._resolved_layers.add("image_proc")
             try:
                 from image_processing.runner import run as image_proc_run
                 self._image_proc_runner = image_proc_run
@@ -135,7 +157,7 @@ class Pipeline:
         Returns:
             Updated manifest with all layer results
         """
-        pipeline_start = time.perf_counter()
+        pipeline_start = time.perf_counter_ns()
         
         # Convert string input to manifest
         if isinstance(manifest, str):
@@ -191,11 +213,11 @@ class Pipeline:
         Returns:
             Updated manifest with all layer results
         """
-        return asyncio.run(self.run_async(manifest))
+        return _run_coroutine(self.run_async(manifest))
     
     async def _run_layer0(self, manifest: PipelineManifest) -> PipelineManifest:
         """Run Layer 0 scanning."""
-        start = time.perf_counter()
+        start = time.perf_counter_ns()
         
         try:
             runner = self._get_layer0_runner()
@@ -232,12 +254,12 @@ class Pipeline:
             manifest.layer0_result.note = str(e)
             manifest.errors.append({"layer": "layer0", "error": str(e)})
         
-        manifest.layer0_result.processing_time_ms = (time.perf_counter() - start) * 1000
+        manifest.layer0_result.processing_time_ms = (time.perf_counter_ns() - start) / 1_000_000
         return manifest
     
     async def _run_input_prep(self, manifest: PipelineManifest) -> PipelineManifest:
         """Run Input Preparation."""
-        start = time.perf_counter()
+        start = time.perf_counter_ns()
         
         try:
             # Import input prep functions
@@ -302,7 +324,7 @@ class Pipeline:
             manifest.input_prep_result.note = str(e)
             manifest.errors.append({"layer": "input_prep", "error": str(e)})
         
-        manifest.input_prep_result.processing_time_ms = (time.perf_counter() - start) * 1000
+        manifest.input_prep_result.processing_time_ms = (time.perf_counter_ns() - start) / 1_000_000
         return manifest
     
     async def _run_input_prep_fallback(self, manifest: PipelineManifest) -> PipelineManifest:
@@ -348,7 +370,7 @@ class Pipeline:
     
     async def _run_image_processing(self, manifest: PipelineManifest) -> PipelineManifest:
         """Run Image Processing."""
-        start = time.perf_counter()
+        start = time.perf_counter_ns()
         
         if not manifest.attachments:
             manifest.image_processing_result.status = ScanStatus.CLEAN
@@ -416,7 +438,7 @@ class Pipeline:
             manifest.image_processing_result.note = str(e)
             manifest.errors.append({"layer": "image_processing", "error": str(e)})
         
-        manifest.image_processing_result.processing_time_ms = (time.perf_counter() - start) * 1000
+        manifest.image_processing_result.processing_time_ms = (time.perf_counter_ns() - start) / 1_000_000
         return manifest
     
     async def _run_image_processing_fallback(self, manifest: PipelineManifest) -> PipelineManifest:
@@ -462,10 +484,10 @@ class Pipeline:
     def _finalize(
         self,
         manifest: PipelineManifest,
-        pipeline_start: float,
+        pipeline_start: int,
     ) -> PipelineManifest:
         """Finalize manifest with overall scores and timing."""
-        manifest.total_processing_time_ms = (time.perf_counter() - pipeline_start) * 1000
+        manifest.total_processing_time_ms = (time.perf_counter_ns() - pipeline_start) / 1_000_000
         manifest.overall_score = compute_overall_score(manifest)
         
         logger.info(
@@ -535,7 +557,7 @@ def run_pipeline(
     Returns:
         Completed pipeline manifest
     """
-    return asyncio.run(run_pipeline_async(text, external_chunks, attachments))
+    return _run_coroutine(run_pipeline_async(text, external_chunks, attachments))
 
 
 # ============================================================================